@@ -1,13 +1,48 @@
 # agents.py
-from google import genai
-import json, re
+from __future__ import annotations   # genai.Client annotations without importing the SDK
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+import asyncio, contextlib, contextvars, functools, inspect, os, re, time
+from deadline import DeadlineExceeded, current as current_deadline
+from llm_cache import ResponseCache, cache_key
+from llm_scheduler import CallScheduler, estimate_tokens
+from profiling import span, stage
+import structured
+from ranking import select_evidence
 
 MODEL_AGENT = "gemini-2.0-flash"
 MODEL_JUDGE = "gemini-2.0-flash"
 
+if TYPE_CHECKING:
+    from google import genai
+
 def make_client(api_key: str):
+    from google import genai   # the SDK is slow to import; CLI/worker paths may never need it
     return genai.Client(api_key=api_key)
 
+# ── Response cache ───────────────────────────────────────────────────────────
+# Judge/control calls run at (near) zero temperature, so an identical prompt gets
+# an equivalent answer; serve repeats from cache. use_cache=None means "cache if
+# temperature <= CACHE_MAX_TEMPERATURE", True/False force it per call. Only answers
+# that parse as verdicts are stored, so one malformed reply isn't served again.
+CACHE_MAX_TEMPERATURE = 0.2
+RESPONSE_CACHE = ResponseCache()
+
+def set_response_cache(cache):
+    """Swap the response cache (any object with get(key)/put(key, text)); None disables it."""
+    global RESPONSE_CACHE
+    RESPONSE_CACHE = cache
+
+# ── Call scheduling ──────────────────────────────────────────────────────────
+# Every generate call goes through one process-wide scheduler: RPM/TPM token buckets,
+# a cap on calls in flight, and priority classes (see llm_scheduler.priority) so a
+# Quick Check isn't stuck behind a benchmark run. None sends calls straight out.
+CALL_SCHEDULER = CallScheduler()
+
+def set_call_scheduler(scheduler):
+    global CALL_SCHEDULER
+    CALL_SCHEDULER = scheduler
+
 # ── A/B role-locked system prompts ───────────────────────────────────────────
 VERIFIER_SYS = (
 "You are Verifier A (PRO side). Your job is to argue that the headline is ACCURATE.\n"
@@ -94,158 +129,653 @@ def _fmt_evidence(ev):
         out.append(f"{eid}: {txt}")
     return "\n".join(out)
 
-def control_verdict(client, headline, evidence=None):
-    ev_txt = _fmt_evidence(evidence or [])
-    prompt = (
+def _control_prompt(headline, evidence):
+    ev_txt = _fmt_evidence(select_evidence(headline, evidence or []))
+    return (
         CONTROL_SYS
         + "\n\nHeadline:\n" + headline
         + "\n\nEvidence:\n" + ev_txt
         + "\n\nOutput JSON only."
     )
-    raw = client.models.generate_content(
-        model=MODEL_JUDGE,
-        contents=prompt,          # single string
-        config={"temperature": 0.0}
-    ).text.strip()
 
-    # tolerate bad JSON
-    try:
-        data = json.loads(raw)
-    except Exception:
-        low = raw.lower()
-        if "misinformation" in low or "false" in low:
-            label = "false"
-        elif "information" in low or "true" in low:
-            label = "true"
-        else:
-            label = "uncertain"
-        data = {"label": label, "confidence": 0.5, "rationale": raw[:400]}
-
-    # Normalize labels to match judge output (true/false/mixed/unverified)
-    label = data.get("label", "uncertain").lower()
-    if label in ["information", "true"]:
-        label = "true"
-    elif label in ["misinformation", "false"]:
-        label = "false"
-    elif label in ["mixed"]:
-        label = "mixed"
-    else:
-        label = "unverified"
-    
-    data["label"] = label
+# older prompts/models used these spellings; the response schema only allows LABELS
+_LABEL_ALIASES = {"information": "true", "misinformation": "false", "uncertain": "unverified"}
+
+def _unparsed(raw):
+    # no guessing a label from keywords: an unreadable answer is reported as such
+    return {"label": "unverified", "confidence": 0,
+            "rationale": "Model response was not valid verdict JSON: " + (raw or "")[:300],
+            "parse_error": True}
+
+def _is_verdict(raw):
+    return structured.is_verdict(raw, aliases=_LABEL_ALIASES)
+
+def _parse_control(raw):
+    parsed = structured.parse_verdict(raw, aliases=_LABEL_ALIASES)
+    if parsed is None:
+        return _unparsed(raw)
+    label, confidence, rationale = parsed
+    return {"label": label, "confidence": confidence, "rationale": rationale[:500]}
+
+# ── Deadlines ────────────────────────────────────────────────────────────────
+# A deadline.Deadline bounds a whole analysis. Debate turns stop JUDGE_RESERVE seconds
+# early (a quarter of a shorter deadline) so the judge still gets its go; anything
+# that doesn't finish in time is noted on the deadline and the verdict comes back
+# marked "degraded" instead of hanging.
+# deadline=None means "the ambient one, if any" (see deadline.use).
+def _resolve(deadline):
+    return deadline if deadline is not None else current_deadline()
+
+def _timeout_verdict(who):
+    return {"label": "unverified", "confidence": 0,
+            "rationale": f"Analysis deadline reached before the {who} finished.",
+            "evidence_used": [], "judge_method": "deadline"}
+
+def _debate_deadline(deadline):
+    return None if deadline is None else deadline.shortened(deadline.judge_reserve())
+
+def _out_of_turn_time(turn_deadline, turns):
+    if turn_deadline is None or not turn_deadline.expired():
+        return False
+    turn_deadline.note(f"debate stopped after {turns} turn(s) at the deadline")
+    return True
+
+def _finish(deadline, *verdicts):
+    if deadline is not None:
+        for v in verdicts:
+            deadline.mark(v)
+
+@stage("control")
+def control_verdict(client, headline, evidence=None, use_cache=None, deadline=None):
+    deadline = _resolve(deadline)
     try:
-        confidence = float(data.get("confidence", 0.5))
-        if confidence <= 1.0:  # 0-1 scale, convert to 0-100
-            confidence = int(confidence * 100)
-        else:  # already 0-100 scale
-            confidence = int(confidence)
-        data["confidence"] = max(0, min(100, confidence))
-    except Exception:
-        data["confidence"] = 50
-    data["rationale"] = data.get("rationale", "")[:500]
-    return data
+        raw = _gen_text(client, MODEL_JUDGE, _control_prompt(headline, evidence), 0.0, use_cache=use_cache,
+                        deadline=deadline, schema=structured.VERDICT_SCHEMA, cache_if=_is_verdict)
+    except DeadlineExceeded:
+        deadline.note("control verdict did not finish")
+        return deadline.mark(_timeout_verdict("control check"))
+    return _parse_control(raw)
+
+async def control_verdict_async(client, headline, evidence=None, use_cache=None, deadline=None):
+    deadline = _resolve(deadline)
+    with span("control"):
+        try:
+            raw = await _gen_text_async(client, MODEL_JUDGE, _control_prompt(headline, evidence), 0.0,
+                                        use_cache=use_cache, deadline=deadline, schema=structured.VERDICT_SCHEMA,
+                                        cache_if=_is_verdict)
+        except DeadlineExceeded:
+            deadline.note("control verdict did not finish")
+            return deadline.mark(_timeout_verdict("control check"))
+    return _parse_control(raw)
+
+# ── Transcript compaction ────────────────────────────────────────────────────
+# Every turn re-sends the transcript, so prompt tokens grow quadratically with rounds.
+# With a budget set, older turns collapse to one-line extractive summaries (no extra
+# model calls) and only the most recent turns go out verbatim.
+# None means "use TURN_TOKEN_BUDGET"; 0 disables compaction.
+TURN_TOKEN_BUDGET = int(os.getenv("TURN_TOKEN_BUDGET", 0))
+KEEP_RECENT_TURNS = 2
+CHARS_PER_TOKEN = 4   # rough English average; only used to size the budget
+
+def _estimate_tokens(text):
+    return len(text or "") // CHARS_PER_TOKEN
+
+def _split_turns(transcript):
+    """'\n[A]\n...\n[B]\n...' -> [('A', text), ('B', text), ...]"""
+    parts = re.split(r"^\[(A|B)\]$", transcript or "", flags=re.M)
+    return [(parts[i], parts[i + 1].strip()) for i in range(1, len(parts) - 1, 2)]
+
+def _join_turns(turns):
+    return "".join(f"\n[{side}]\n{text}\n" for side, text in turns)
+
+def _summarize_turn(side, text, max_chars=160):
+    """First claim line plus every evidence ID the turn cited."""
+    claim = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if line.lower().startswith("claims:"):
+            line = line[len("claims:"):].strip()
+        if line:
+            claim = line
+            break
+    ids = list(dict.fromkeys(re.findall(r"\bR\d+\b", text)))
+    cites = f" [cites {', '.join(ids)}]" if ids else ""
+    if len(claim) > max_chars:
+        claim = claim[:max_chars].rsplit(" ", 1)[0] + "…"
+    return f"[{side}] {claim}{cites}"
+
+def compact_transcript(transcript, token_budget=None, keep_recent=KEEP_RECENT_TURNS):
+    """Fit the transcript into ~token_budget tokens: recent turns verbatim, older ones summarized."""
+    budget = TURN_TOKEN_BUDGET if token_budget is None else token_budget
+    if not budget or _estimate_tokens(transcript) <= budget:
+        return transcript
+    turns = _split_turns(transcript)
+    keep = min(keep_recent, len(turns))
+    while True:
+        older, recent = turns[:len(turns) - keep], turns[len(turns) - keep:]
+        summaries = [_summarize_turn(side, text) for side, text in older]
+        # drop the oldest summaries first if even they don't fit
+        while summaries and _estimate_tokens("\n".join(summaries) + _join_turns(recent)) > budget:
+            summaries.pop(0)
+        body = _join_turns(recent)
+        if summaries:
+            body = "\n(Earlier turns, summarized)\n" + "\n".join(summaries) + "\n" + body
+        if _estimate_tokens(body) <= budget or keep <= 1:
+            return body
+        keep -= 1
 
 # ── Agent turn + text generation ─────────────────────────────────────────────
-def _gen_text(client: genai.Client, model: str, prompt_text: str, temperature: float) -> str:
-    return client.models.generate_content(
+def _cache_key_for(model, prompt_text, temperature, use_cache, schema=None):
+    if RESPONSE_CACHE is None:
+        return None
+    if use_cache is None:
+        use_cache = temperature <= CACHE_MAX_TEMPERATURE
+    # schema-constrained answers are a different output format from free text
+    return cache_key(model + ("|json" if schema else ""), temperature, prompt_text) if use_cache else None
+
+def _config(temperature, schema):
+    return structured.json_config(temperature, schema) if schema else {"temperature": temperature}
+
+def _cache_lookup(key):
+    if not key:
+        return None
+    with span("llm.cache_lookup"):
+        return RESPONSE_CACHE.get(key)
+
+def _gen_text(client: genai.Client, model: str, prompt_text: str, temperature: float,
+              use_cache=None, deadline=None, schema=None, cache_if=None) -> str:
+    """Model text for prompt_text; with schema, the model is constrained to JSON of that shape.
+
+    With cache_if, only responses it accepts are cached (a malformed answer isn't replayed).
+    """
+    key = _cache_key_for(model, prompt_text, temperature, use_cache, schema)
+    hit = _cache_lookup(key)
+    if hit is not None:
+        return hit
+    call = functools.partial(
+        client.models.generate_content,
         model=model,
         contents=prompt_text,   # string only
-        config={"temperature": temperature}
-    ).text.strip()
+        config=_config(temperature, schema)
+    )
+    # the SDK call can't be interrupted, so with a deadline we stop waiting for it instead
+    # (the scheduler keeps its slot until the abandoned request actually returns)
+    with span("llm.generate"):
+        if CALL_SCHEDULER is not None:
+            resp = CALL_SCHEDULER.call(call, estimate_tokens(prompt_text), deadline=deadline)
+        elif deadline is not None:
+            resp = deadline.call(call)
+        else:
+            resp = call()
+    text = resp.text.strip()
+    if key and text and (cache_if is None or cache_if(text)):
+        RESPONSE_CACHE.put(key, text)
+    return text
 
-def _agent_turn(client, sys_prompt, headline, transcript, evidence):
-    if not evidence:
-        return "Refusal: No evidence provided."
-    ev = "Evidence:\n" + "\n".join(f"- {e['id']}: {e['text']}" for e in evidence[:8])
+async def _gen_text_async(client: genai.Client, model: str, prompt_text: str, temperature: float,
+                          use_cache=None, deadline=None, schema=None, cache_if=None) -> str:
+    key = _cache_key_for(model, prompt_text, temperature, use_cache, schema)
+    # the cache may read and write its SQLite tier; keep that off the event loop
+    hit = await asyncio.to_thread(_cache_lookup, key) if key else None
+    if hit is not None:
+        return hit
+    def request():   # a fresh coroutine per attempt (quota errors are retried)
+        call = client.aio.models.generate_content(
+            model=model,
+            contents=prompt_text,
+            config=_config(temperature, schema)
+        )
+        return call if deadline is None else deadline.wait(call)
+
+    with span("llm.generate"):
+        if CALL_SCHEDULER is None:
+            resp = await request()
+        else:
+            resp = await CALL_SCHEDULER.call_async(request, estimate_tokens(prompt_text), deadline=deadline)
+    text = resp.text.strip()
+    if key and text and (cache_if is None or cache_if(text)):
+        await asyncio.to_thread(RESPONSE_CACHE.put, key, text)
+    return text
+
+async def _gen_text_stream_async(client: genai.Client, model: str, prompt_text: str, temperature: float,
+                                 deadline=None):
+    """Yield text chunks as the model produces them (uncached; used for debate turns)."""
+    # the slot is held until the stream ends; a quota error mid-stream is not retried
+    slot = (contextlib.nullcontext() if CALL_SCHEDULER is None
+            else CALL_SCHEDULER.slot_async(estimate_tokens(prompt_text), deadline=deadline))
+    with span("llm.generate"):
+        async with slot:
+            stream = client.aio.models.generate_content_stream(
+                model=model,
+                contents=prompt_text,
+                config={"temperature": temperature}
+            )
+            if inspect.isawaitable(stream):   # newer google-genai returns the iterator from a coroutine
+                stream = await (stream if deadline is None else deadline.wait(stream))
+            chunks = stream.__aiter__()
+            while True:
+                # bound each chunk rather than the whole loop: this generator yields between chunks
+                nxt = chunks.__anext__()
+                try:
+                    chunk = await (nxt if deadline is None else deadline.wait(nxt))
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    yield chunk.text
+
+REPEAT_HINT = "\nAvoid repetition. Add one new argument and one new rebuttal."
+REGENERATE_HINT = "\nYour draft repeated your previous turn. Make a different claim, rebuttal and citation."
+
+def _agent_prompt(sys_prompt, headline, transcript, evidence, token_budget=None):
+    ev = "Evidence:\n" + "\n".join(f"- {e['id']}: {e['text']}" for e in select_evidence(headline, evidence))
+    # ask for something new up front: cheaper than regenerating a repeated turn afterwards
+    spoke_before = f"\n[{_side(sys_prompt)}]\n" in (transcript or "")
+    transcript = compact_transcript(transcript, token_budget)
     user = (
         f"Headline: {headline}\n"
         f"Transcript:\n{transcript or '(none)'}\n"
         f"{ev}\n"
         "Your turn. Quote opponent in <rebut>…</rebut> and cite an ID."
+        + (REPEAT_HINT if spoke_before else "")
     )
-    prompt = sys_prompt + "\n\n" + user
-    out = _gen_text(client, MODEL_AGENT, prompt, 0.7)
+    return sys_prompt + "\n\n" + user
+
+def _side(sys_prompt):
+    return 'A' if 'Verifier' in sys_prompt else 'B'
+
+def _repeats_last_turn(side, transcript, out):
     # light repetition guard
-    marker = f"\n[{ 'A' if 'Verifier' in sys_prompt else 'B'}]\n"
+    marker = f"\n[{side}]\n"
     last_idx = transcript.rfind(marker)
-    if last_idx != -1:
-        prev = transcript[last_idx+len(marker):].strip()[:300]
-        if prev and out[:160].lower() == prev[:160].lower():
-            out = _gen_text(client, MODEL_AGENT, prompt + "\nAvoid repetition. Add one new argument and one new rebuttal.", 0.6)
+    if last_idx == -1:
+        return False
+    prev = transcript[last_idx+len(marker):].strip()[:300]
+    return bool(prev) and out[:160].lower() == prev[:160].lower()
+
+def _agent_turn(client, sys_prompt, headline, transcript, evidence, token_budget=None, deadline=None,
+                regenerate=True):
+    if not evidence:
+        return "Refusal: No evidence provided."
+    prompt = _agent_prompt(sys_prompt, headline, transcript, evidence, token_budget)
+    side = _side(sys_prompt)
+    with span(f"agent_turn.{side}"):
+        out = _gen_text(client, MODEL_AGENT, prompt, 0.7, deadline=deadline)
+    structured.STATS.add("agent_turns")
+    if regenerate and _repeats_last_turn(side, transcript, out):
+        structured.STATS.add("regenerations")
+        with span("agent_turn.regenerate"):
+            try:
+                out = _gen_text(client, MODEL_AGENT, prompt + REGENERATE_HINT, 0.6, deadline=deadline)
+            except DeadlineExceeded:
+                pass   # a repetitive turn beats no turn
+    return out
+
+async def _agent_turn_async(client, sys_prompt, headline, transcript, evidence, token_budget=None,
+                            deadline=None, regenerate=True):
+    if not evidence:
+        return "Refusal: No evidence provided."
+    prompt = _agent_prompt(sys_prompt, headline, transcript, evidence, token_budget)
+    side = _side(sys_prompt)
+    with span(f"agent_turn.{side}"):
+        out = await _gen_text_async(client, MODEL_AGENT, prompt, 0.7, deadline=deadline)
+    structured.STATS.add("agent_turns")
+    if regenerate and _repeats_last_turn(side, transcript, out):
+        structured.STATS.add("regenerations")
+        with span("agent_turn.regenerate"):
+            try:
+                out = await _gen_text_async(client, MODEL_AGENT, prompt + REGENERATE_HINT, 0.6, deadline=deadline)
+            except DeadlineExceeded:
+                pass
     return out
 
 # ── AI Judge Agent ───────────────────────────────────────────────────────────
-def judge_verdict(client: genai.Client, headline: str, transcript: str, evidence=None) -> dict:
-    """AI judge analyzes the debate and makes a verdict"""
-    
-    # Format evidence for the judge
-    ev_txt = _fmt_evidence(evidence or [])
-    
-    # Create judge prompt
-    prompt = (
+def _judge_prompt(headline, transcript, evidence, token_budget=None):
+    # Format evidence for the judge (same relevance cut the agents saw)
+    ev_txt = _fmt_evidence(select_evidence(headline, evidence or []))
+    transcript = compact_transcript(transcript, token_budget)
+    return (
         JUDGE_SYS
         + f"\n\nHeadline to evaluate:\n{headline}"
         + f"\n\nEvidence available:\n{ev_txt}"
         + f"\n\nDebate transcript:\n{transcript}"
         + "\n\nAnalyze the debate and provide your verdict in JSON format."
     )
-    
-    # Get judge response
-    raw = _gen_text(client, MODEL_JUDGE, prompt, 0.1)  # Low temperature for consistency
-    
-    # Parse JSON response with fallback
-    try:
-        data = json.loads(re.sub(r"```json|```", "", raw).strip())
-    except Exception:
-        # Fallback parsing if JSON is malformed
-        raw_lower = raw.lower()
-        if "false" in raw_lower or "misleading" in raw_lower or "inaccurate" in raw_lower:
-            label = "false"
-        elif "true" in raw_lower or "accurate" in raw_lower or "correct" in raw_lower:
-            label = "true"
-        elif "mixed" in raw_lower or "partial" in raw_lower:
-            label = "mixed"
-        else:
-            label = "unverified"
-        
-        data = {
-            "label": label,
-            "confidence": 60,
-            "rationale": raw[:300]
-        }
-    
-    # Validate and clean up the response
-    label = str(data.get("label", "unverified")).lower()
-    if label not in {"true", "false", "mixed", "unverified"}:
-        label = "unverified"
-    
-    try:
-        confidence = int(data.get("confidence", 60))
-        confidence = max(0, min(100, confidence))
-    except:
-        confidence = 60
-    
-    rationale = str(data.get("rationale", "Judge analysis completed"))[:400]
-    
+
+def _parse_judge(raw, transcript):
+    parsed = structured.parse_verdict(raw, aliases=_LABEL_ALIASES)
+    if parsed is None:
+        verdict = dict(_unparsed(raw), judge_method="unparsed")
+    else:
+        label, confidence, rationale = parsed
+        verdict = {"label": label, "confidence": confidence,
+                   "rationale": rationale[:400] or "Judge analysis completed", "judge_method": "ai_analysis"}
+
     # Extract evidence citations from transcript
     cited = re.findall(r"\bR\d+\b", transcript or "")
-    cited = [c for i, c in enumerate(cited) if c not in cited[:i]][:6]  # Remove duplicates
-    
-    return {
-        "label": label,
-        "confidence": confidence,
-        "rationale": rationale,
-        "evidence_used": cited,
-        "judge_method": "ai_analysis"
-    }
+    verdict["evidence_used"] = list(dict.fromkeys(cited))[:6]
+    return verdict
+
+@stage("judge")
+def judge_verdict(client: genai.Client, headline: str, transcript: str, evidence=None,
+                  use_cache=None, token_budget=None, deadline=None) -> dict:
+    """AI judge analyzes the debate and makes a verdict"""
+    deadline = _resolve(deadline)
+    prompt = _judge_prompt(headline, transcript, evidence, token_budget)
+    try:
+        # Low temperature for consistency
+        raw = _gen_text(client, MODEL_JUDGE, prompt, 0.1, use_cache=use_cache, deadline=deadline,
+                        schema=structured.VERDICT_SCHEMA, cache_if=_is_verdict)
+    except DeadlineExceeded:
+        deadline.note("judge did not finish")
+        return deadline.mark(_timeout_verdict("judge"))
+    return _parse_judge(raw, transcript)
+
+async def judge_verdict_async(client: genai.Client, headline: str, transcript: str, evidence=None,
+                              use_cache=None, token_budget=None, deadline=None) -> dict:
+    """Async judge_verdict."""
+    deadline = _resolve(deadline)
+    prompt = _judge_prompt(headline, transcript, evidence, token_budget)
+    with span("judge"):
+        try:
+            raw = await _gen_text_async(client, MODEL_JUDGE, prompt, 0.1, use_cache=use_cache, deadline=deadline,
+                                        schema=structured.VERDICT_SCHEMA, cache_if=_is_verdict)
+        except DeadlineExceeded:
+            deadline.note("judge did not finish")
+            return deadline.mark(_timeout_verdict("judge"))
+    return _parse_judge(raw, transcript)
+
+# ── Adaptive debate ──────────────────────────────────────────────────────────
+# Clear-cut headlines don't need every round. In adaptive mode the debate stops once
+# it has converged: a side repeats itself (instead of paying for a regeneration), a
+# round adds little new wording, a round cites no evidence ID not already cited, or
+# a confident control verdict is matched by an early judge call. Off by default, so
+# results stay comparable; callers opt in with adaptive=True (or ADAPTIVE_DEBATE=1).
+ADAPTIVE_DEBATE = os.getenv("ADAPTIVE_DEBATE", "0") == "1"
+NOVELTY_MIN = 0.35       # share of a turn's word trigrams new to that side
+CONTROL_CONFIDENT = 85   # control confidence at which an agreeing judge ends the debate
+_EVIDENCE_ID = re.compile(r"\b[A-Z]{1,3}\d+\b")
+
+def _trigrams(text):
+    words = re.findall(r"\w+", (text or "").lower())
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+def control_probe(future):
+    """Callable returning the control verdict once `future` has it, else None.
+
+    Accepts concurrent or asyncio futures resolving to a verdict or (verdict, seconds).
+    """
+    def probe():
+        if not future.done() or future.cancelled() or future.exception() is not None:
+            return None
+        out = future.result()
+        return out[0] if isinstance(out, tuple) else out
+    return probe
+
+class _Convergence:
+    """Per-debate bookkeeping for the early-exit signals."""
+
+    def __init__(self, rounds, adaptive, control=None):
+        self.rounds = max(1, rounds)
+        self.adaptive = ADAPTIVE_DEBATE if adaptive is None else adaptive
+        self.control = control          # zero-arg callable -> control verdict or None
+        self.turns = 0
+        self.reason = None
+        self._seen = {"A": set(), "B": set()}
+        self._last = {}
+        self._cited = set()
+        self._round_novelty = []
+        self._round_new_ids = False
+        self._control_tried = False
+
+    @property
+    def rounds_run(self):
+        return -(-self.turns // 2)
+
+    def add_turn(self, side, text):
+        """Record a finished turn; returns an exit reason if the debate should stop now."""
+        self.turns += 1
+        prev, self._last[side] = self._last.get(side), text
+        grams = _trigrams(text)
+        self._round_novelty.append(len(grams - self._seen[side]) / len(grams) if grams else 0.0)
+        self._seen[side] |= grams
+        ids = set(_EVIDENCE_ID.findall(text or ""))
+        self._round_new_ids |= bool(ids - self._cited)
+        self._cited |= ids
+        if self.adaptive and prev and text[:160].lower() == prev[:160].lower():
+            self.reason = f"{side} repeated its previous turn"
+        return self.reason
+
+    def end_round(self):
+        """Called after B's turn; returns an exit reason if more rounds would add nothing."""
+        novelty, new_ids = self._round_novelty, self._round_new_ids
+        self._round_novelty, self._round_new_ids = [], False
+        if not self.adaptive or self.rounds_run >= self.rounds:
+            return None
+        if self.rounds_run >= 2 and max(novelty, default=0) < NOVELTY_MIN:
+            self.reason = f"low novelty ({max(novelty, default=0):.2f}) in round {self.rounds_run}"
+        elif self.rounds_run >= 2 and not new_ids:
+            self.reason = f"no new evidence cited in round {self.rounds_run}"
+        return self.reason
+
+    def confident_control(self):
+        """The control verdict, once, if it is in and confident enough to test against the judge."""
+        if not self.adaptive or self._control_tried or self.control is None or self.rounds_run >= self.rounds:
+            return None
+        ctrl = self.control()
+        if not ctrl:
+            return None
+        self._control_tried = True
+        try:
+            confident = int(ctrl.get("confidence", 0)) >= CONTROL_CONFIDENT
+        except (TypeError, ValueError):
+            confident = False
+        return ctrl if confident and ctrl.get("label") in ("true", "false") else None
+
+    def agrees(self, verdict, ctrl):
+        if verdict.get("label") == ctrl.get("label") and verdict.get("judge_method") != "deadline":
+            self.reason = f"judge agrees with confident control ({ctrl['label']}, {ctrl['confidence']})"
+        return self.reason
+
+    def annotate(self, verdict):
+        verdict["rounds_run"] = self.rounds_run
+        verdict["early_exit_reason"] = self.reason
+        return verdict
 
 # ── Orchestrator ─────────────────────────────────────────────────────────────
-def run_misinfo(client, headline, evidence=None, rounds=2):
-    t = ""
-    a = _agent_turn(client, VERIFIER_SYS, headline, t, evidence); t += f"\n[A]\n{a}\n"
-    b = _agent_turn(client, CHALLENGER_SYS, headline, t, evidence); t += f"\n[B]\n{b}\n"
-    for _ in range(rounds - 1):
-        a = _agent_turn(client, VERIFIER_SYS, headline, t, evidence); t += f"\n[A]\n{a}\n"
-        b = _agent_turn(client, CHALLENGER_SYS, headline, t, evidence); t += f"\n[B]\n{b}\n"
-    verdict = judge_verdict(client, headline, t, evidence)
+def _turns(rounds):
+    """A then B, `rounds` times (at least once)."""
+    return [("A", VERIFIER_SYS), ("B", CHALLENGER_SYS)] * max(1, rounds)
+
+@stage("debate")
+def run_misinfo(client, headline, evidence=None, rounds=2, token_budget=None, deadline=None,
+                adaptive=None, control=None):
+    """A/B debate for up to `rounds` rounds, then the judge.
+
+    adaptive (default ADAPTIVE_DEBATE) allows stopping early on convergence;
+    control is an optional zero-arg callable returning the control verdict once
+    available (see control_probe). The verdict records rounds_run and early_exit_reason.
+    """
+    deadline = _resolve(deadline)
+    turn_deadline = _debate_deadline(deadline)
+    conv = _Convergence(rounds, adaptive, control)
+    t, verdict = "", None
+    for side, sys_prompt in _turns(rounds):
+        if _out_of_turn_time(turn_deadline, conv.turns):
+            break
+        try:
+            out = _agent_turn(client, sys_prompt, headline, t, evidence, token_budget, deadline=turn_deadline,
+                              regenerate=not conv.adaptive)
+        except DeadlineExceeded:
+            _out_of_turn_time(turn_deadline, conv.turns)
+            break
+        t += f"\n[{side}]\n{out}\n"
+        if conv.add_turn(side, out) or (side == "B" and conv.end_round()):
+            break
+        ctrl = conv.confident_control() if side == "B" else None
+        if ctrl:
+            verdict = judge_verdict(client, headline, t, evidence, token_budget=token_budget, deadline=deadline)
+            if conv.agrees(verdict, ctrl):
+                break
+            verdict = None   # the debate isn't settled; keep going and judge the full transcript
+    if verdict is None:
+        verdict = judge_verdict(client, headline, t, evidence, token_budget=token_budget, deadline=deadline)
+    conv.annotate(verdict)
+    _finish(deadline, verdict)
+    return t.strip(), verdict
+
+async def run_misinfo_async(client, headline, evidence=None, rounds=2, token_budget=None, deadline=None,
+                            adaptive=None, control=None):
+    """Async run_misinfo: same turns and judge, but awaits the model instead of blocking a thread."""
+    deadline = _resolve(deadline)
+    turn_deadline = _debate_deadline(deadline)
+    conv = _Convergence(rounds, adaptive, control)
+    with span("debate"):
+        t, verdict = "", None
+        for side, sys_prompt in _turns(rounds):
+            if _out_of_turn_time(turn_deadline, conv.turns):
+                break
+            try:
+                out = await _agent_turn_async(client, sys_prompt, headline, t, evidence, token_budget,
+                                              deadline=turn_deadline, regenerate=not conv.adaptive)
+            except DeadlineExceeded:
+                _out_of_turn_time(turn_deadline, conv.turns)
+                break
+            t += f"\n[{side}]\n{out}\n"
+            if conv.add_turn(side, out) or (side == "B" and conv.end_round()):
+                break
+            ctrl = conv.confident_control() if side == "B" else None
+            if ctrl:
+                verdict = await judge_verdict_async(client, headline, t, evidence, token_budget=token_budget,
+                                                    deadline=deadline)
+                if conv.agrees(verdict, ctrl):
+                    break
+                verdict = None
+        if verdict is None:
+            verdict = await judge_verdict_async(client, headline, t, evidence, token_budget=token_budget,
+                                                deadline=deadline)
+    conv.annotate(verdict)
+    _finish(deadline, verdict)
     return t.strip(), verdict
+
+async def _agent_turn_stream_async(client, sys_prompt, headline, transcript, evidence, token_budget=None,
+                                   deadline=None, regenerate=True):
+    """Streaming _agent_turn: yields the turn text so far after every model chunk."""
+    if not evidence:
+        yield "Refusal: No evidence provided."
+        return
+    prompt = _agent_prompt(sys_prompt, headline, transcript, evidence, token_budget)
+    side = _side(sys_prompt)
+    out = ""
+    with span(f"agent_turn.{side}"):
+        async for piece in _gen_text_stream_async(client, MODEL_AGENT, prompt, 0.7, deadline=deadline):
+            out += piece
+            yield out
+    out = out.strip()
+    structured.STATS.add("agent_turns")
+    if regenerate and _repeats_last_turn(side, transcript, out):
+        structured.STATS.add("regenerations")
+        with span("agent_turn.regenerate"):
+            try:
+                out = await _gen_text_async(client, MODEL_AGENT, prompt + REGENERATE_HINT, 0.6, deadline=deadline)
+            except DeadlineExceeded:
+                pass
+    yield out
+
+async def run_misinfo_stream(client, headline, evidence=None, rounds=2, token_budget=None, deadline=None,
+                             adaptive=None, control=None):
+    """Streaming run_misinfo. Async-yields events as the debate unfolds:
+
+    {"type": "chunk", "side", "text", "transcript"}  partial turn (transcript includes it)
+    {"type": "turn",  "side", "text", "transcript"}  finished turn
+    {"type": "verdict", "transcript", "verdict"}     judge result, always last
+
+    A turn cut off by the deadline is dropped from the transcript the judge sees.
+    """
+    deadline = _resolve(deadline)
+    turn_deadline = _debate_deadline(deadline)
+    conv = _Convergence(rounds, adaptive, control)
+    with span("debate"):
+        t, verdict = "", None
+        for side, sys_prompt in _turns(rounds):
+            if _out_of_turn_time(turn_deadline, conv.turns):
+                break
+            text = ""
+            try:
+                async for text in _agent_turn_stream_async(client, sys_prompt, headline, t, evidence, token_budget,
+                                                           deadline=turn_deadline, regenerate=not conv.adaptive):
+                    yield {"type": "chunk", "side": side, "text": text,
+                           "transcript": (t + f"\n[{side}]\n{text}\n").strip()}
+            except DeadlineExceeded:
+                _out_of_turn_time(turn_deadline, conv.turns)
+                break
+            t += f"\n[{side}]\n{text}\n"
+            yield {"type": "turn", "side": side, "text": text, "transcript": t.strip()}
+            if conv.add_turn(side, text) or (side == "B" and conv.end_round()):
+                break
+            ctrl = conv.confident_control() if side == "B" else None
+            if ctrl:
+                verdict = await judge_verdict_async(client, headline, t, evidence, token_budget=token_budget,
+                                                    deadline=deadline)
+                if conv.agrees(verdict, ctrl):
+                    break
+                verdict = None
+        if verdict is None:
+            verdict = await judge_verdict_async(client, headline, t, evidence, token_budget=token_budget,
+                                                deadline=deadline)
+    conv.annotate(verdict)
+    _finish(deadline, verdict)
+    yield {"type": "verdict", "transcript": t.strip(), "verdict": verdict}
+
+# Debate and control only share the (already gathered) evidence, so run them side by side.
+_BRANCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="analysis")
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, round(time.perf_counter() - t0, 3)
+
+async def _timed_async(coro):
+    t0 = time.perf_counter()
+    out = await coro
+    return out, round(time.perf_counter() - t0, 3)
+
+def run_with_control(client, headline, evidence=None, rounds=2, token_budget=None, deadline=None,
+                     adaptive=None):
+    """Run the debate and the control verdict concurrently.
+
+    Returns (transcript, verdict, control, timing) where timing holds
+    per-branch wall time in seconds and the joined total.
+    """
+    deadline = _resolve(deadline)
+    t0 = time.perf_counter()
+    ctx = contextvars.copy_context()  # keep profiling traces across the thread hop
+    control_f = _BRANCH_POOL.submit(ctx.run, _timed, control_verdict, client, headline, evidence,
+                                    deadline=deadline)
+    (transcript, verdict), debate_s = _timed(run_misinfo, client, headline, evidence, rounds=rounds,
+                                             token_budget=token_budget, deadline=deadline,
+                                             adaptive=adaptive, control=control_probe(control_f))
+    control, control_s = control_f.result()
+    _finish(deadline, verdict, control)   # either branch may have been the one cut short
+    timing = {"debate_s": debate_s, "control_s": control_s,
+              "total_s": round(time.perf_counter() - t0, 3)}
+    return transcript, verdict, control, timing
+
+async def run_with_control_async(client, headline, evidence=None, rounds=2, token_budget=None, deadline=None,
+                                 adaptive=None):
+    """Async run_with_control; both branches share the event loop instead of threads."""
+    deadline = _resolve(deadline)
+    t0 = time.perf_counter()
+    control_task = asyncio.ensure_future(_timed_async(control_verdict_async(client, headline, evidence,
+                                                                            deadline=deadline)))
+    try:
+        (transcript, verdict), debate_s = await _timed_async(run_misinfo_async(
+            client, headline, evidence, rounds=rounds, token_budget=token_budget, deadline=deadline,
+            adaptive=adaptive, control=control_probe(control_task)))
+        control, control_s = await control_task
+    finally:
+        if not control_task.done():
+            control_task.cancel()
+    _finish(deadline, verdict, control)
+    timing = {"debate_s": debate_s, "control_s": control_s,
+              "total_s": round(time.perf_counter() - t0, 3)}
+    return transcript, verdict, control, timing
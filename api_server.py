@@ -0,0 +1,280 @@
+# api_server.py - headless JSON HTTP API over the analysis pipeline (no Gradio)
+#
+#   python api_server.py --port 8080            # uses GEMINI_API_KEY
+#   python api_server.py --fake                 # offline stand-in model
+#
+#   POST /v1/check        {"headline": "...", "evidence": "E1|...", "rounds": 2, "source": "news"}
+#   POST /v1/check/batch  {"items": [{"headline": "..."}, ...], "defaults": {"rounds": 1}}
+#   GET  /healthz         liveness + whether a model client is configured
+#   GET  /metrics         admission queues, model-call scheduler, parse/regeneration rates, caches
+#
+# Results are the pipeline's plain dicts (see pipeline.build_result), not display strings.
+# "mode": "quick" runs only the single-pass control verdict. A full queue answers 503 with
+# Retry-After right away. Set API_TOKEN to require "Authorization: Bearer <token>".
+import argparse, hmac, json, os, sys, time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import agents2, structured
+from jobs import add_client_args, client_from_args, record_id, run_pool
+from llm_scheduler import BATCH, INTERACTIVE, priority
+from pipeline import analyze, parse_evidence, quick_check, source_key
+from serving import AdmissionGate, Busy
+
+API_TOKEN = os.getenv("API_TOKEN", "")
+MAX_BODY = int(os.getenv("API_MAX_BODY", 1024 * 1024))     # bytes
+MAX_BATCH = int(os.getenv("API_MAX_BATCH", 50))            # headlines per batch request
+BATCH_WORKERS = int(os.getenv("API_BATCH_WORKERS", 4))     # headlines of one batch checked at once
+
+CHECK_GATE = AdmissionGate("check")
+BATCH_GATE = AdmissionGate("batch", workers=max(1, CHECK_GATE.workers // 4), max_queue=CHECK_GATE.max_queue // 2)
+
+class BadRequest(ValueError):
+    pass
+
+# ── Request parsing ──────────────────────────────────────────────────────────
+def _int(spec, key, default, lo, hi):
+    value = spec.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or not lo <= value <= hi:
+        raise BadRequest(f"'{key}' must be an integer between {lo} and {hi}")
+    return value
+
+def _bool(spec, key, default):
+    value = spec.get(key, default)
+    if not isinstance(value, bool):
+        raise BadRequest(f"'{key}' must be true or false")
+    return value
+
+def _evidence(value):
+    """Manual evidence as a list of {id, text} items; 'ID|text' strings are accepted as list items too."""
+    if value is None or isinstance(value, str):
+        return value
+    if not isinstance(value, list):
+        raise BadRequest("'evidence' must be 'ID|text' lines or a list of {id, text} objects")
+    items = []
+    for it in value:
+        if isinstance(it, str):
+            items.extend(parse_evidence(it))
+        elif isinstance(it, dict) and isinstance(it.get("id"), str) and isinstance(it.get("text"), str):
+            items.append({k: it[k] for k in ("id", "text", "url", "title") if isinstance(it.get(k), str)})
+        else:
+            raise BadRequest("each evidence item must be an 'ID|text' string or an object with string 'id' and 'text'")
+    return items
+
+def parse_check(spec, defaults=None):
+    """Validated keyword arguments for one check from its JSON object."""
+    if not isinstance(spec, dict):
+        raise BadRequest("each check must be a JSON object")
+    spec = {**(defaults or {}), **spec}
+    headline = spec.get("headline")
+    if not isinstance(headline, str) or not headline.strip():
+        raise BadRequest("'headline' is required")
+    evidence = _evidence(spec.get("evidence"))
+    source = spec.get("source", "news")
+    try:
+        source_key(source)
+    except ValueError as e:
+        raise BadRequest(str(e)) from None
+    mode = spec.get("mode", "full")
+    if mode not in ("full", "quick"):
+        raise BadRequest("'mode' must be 'full' or 'quick'")
+    deadline_s = spec.get("deadline_s")
+    if deadline_s is not None and (isinstance(deadline_s, bool) or not isinstance(deadline_s, (int, float))
+                                   or deadline_s < 0):
+        raise BadRequest("'deadline_s' must be a non-negative number")
+    adaptive = spec.get("adaptive")
+    if adaptive is not None and not isinstance(adaptive, bool):
+        raise BadRequest("'adaptive' must be true or false")
+    return {
+        "mode": mode,
+        "headline": headline.strip(),
+        "evidence": evidence,
+        "auto_research": _bool(spec, "auto_research", mode == "full") and source_key(source) is not None,
+        "k": _int(spec, "k", 5, 1, 10),
+        "source": source,
+        "rounds": _int(spec, "rounds", 2, 1, 5),
+        "reuse": _bool(spec, "reuse", True),
+        "deadline_s": deadline_s,
+        "adaptive": adaptive,
+    }
+
+def run_check(client, args):
+    if args["mode"] == "quick":
+        return quick_check(client, args["headline"], args["evidence"], args["auto_research"],
+                           args["k"], args["source"], deadline_s=args["deadline_s"])
+    return analyze(client, args["headline"], args["evidence"], rounds=args["rounds"],
+                   auto_research=args["auto_research"], k=args["k"], source=args["source"],
+                   reuse=args["reuse"], deadline_s=args["deadline_s"], adaptive=args["adaptive"])
+
+def parse_batch(body):
+    """(items, validated keyword arguments per item) from a batch request body."""
+    items, defaults = body.get("items"), body.get("defaults") or {}
+    if not isinstance(items, list) or not items:
+        raise BadRequest("'items' must be a non-empty list")
+    if len(items) > MAX_BATCH:
+        raise BadRequest(f"at most {MAX_BATCH} items per batch")
+    if not isinstance(defaults, dict):
+        raise BadRequest("'defaults' must be an object")
+    return items, [parse_check(spec, defaults) for spec in items]   # reject the whole batch on a bad item
+
+def run_batch(client, items, parsed):
+    def _one(i):
+        spec, args = items[i], parsed[i]
+        out = {"index": i, "id": str(spec.get("id") or record_id(args["headline"]))}
+        with priority(BATCH):
+            try:
+                out["result"] = run_check(client, args)
+            except Exception as e:   # one failed headline doesn't fail the batch
+                out["error"] = f"{type(e).__name__}: {e}"
+        return out
+
+    t0 = time.perf_counter()
+    results = run_pool(list(range(len(items))), _one, workers=BATCH_WORKERS)
+    return {"results": results, "failed": sum(1 for r in results if "error" in r),
+            "wall_s": round(time.perf_counter() - t0, 3)}
+
+def metrics():
+    out = {"gates": [CHECK_GATE.stats(), BATCH_GATE.stats()]}
+    if agents2.CALL_SCHEDULER is not None:
+        out["model_calls"] = agents2.CALL_SCHEDULER.stats()
+    out["structured_output"] = structured.STATS.snapshot()
+    if agents2.RESPONSE_CACHE is not None:
+        out["response_cache"] = dict(agents2.RESPONSE_CACHE.stats)
+    return out
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+class Handler(BaseHTTPRequestHandler):
+    server_version = "misinfo-api/1"
+    protocol_version = "HTTP/1.1"   # keep-alive for backend callers
+    client = None                   # set by serve()
+
+    def log_message(self, fmt, *args):
+        sys.stderr.write(f"{self.address_string()} {fmt % args}\n")
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None):
+        self._send(status, {"error": message}, headers)
+
+    def _authorized(self):
+        if not API_TOKEN:
+            return True
+        given = self.headers.get("Authorization", "")
+        return hmac.compare_digest(given.encode("utf-8"), f"Bearer {API_TOKEN}".encode("utf-8"))
+
+    def _skip_body(self):
+        """Read and drop the request body before an early reply, so keep-alive stays in sync."""
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if 0 <= length <= MAX_BODY:
+            self.rfile.read(length)
+        else:
+            self.close_connection = True
+
+    def _body(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.close_connection = True   # can't tell where this body ends
+            raise BadRequest("bad Content-Length") from None
+        if length <= 0:
+            raise BadRequest("a JSON body is required")
+        if length > MAX_BODY:
+            # the body is left unread; on keep-alive it would be parsed as the next request
+            self.close_connection = True
+            raise BadRequest(f"body larger than {MAX_BODY} bytes")
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise BadRequest(f"invalid JSON: {e}") from None
+        if not isinstance(body, dict):
+            raise BadRequest("the body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            self._send(HTTPStatus.OK, {"status": "ok", "model": self.client is not None})
+        elif path == "/metrics":
+            if not self._authorized():
+                return self._error(HTTPStatus.UNAUTHORIZED, "missing or wrong bearer token")
+            self._send(HTTPStatus.OK, metrics())
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"no route {path}")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        routes = {"/v1/check": (CHECK_GATE, parse_check, self._check),
+                  "/v1/check/batch": (BATCH_GATE, parse_batch, self._batch)}
+        if path not in routes:
+            self._skip_body()
+            return self._error(HTTPStatus.NOT_FOUND, f"no route {path}")
+        if not self._authorized():
+            self._skip_body()
+            return self._error(HTTPStatus.UNAUTHORIZED, "missing or wrong bearer token")
+        if self.client is None:
+            self._skip_body()
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, "model client not configured")
+        gate, parse, handle = routes[path]
+        try:
+            args = parse(self._body())   # malformed requests get their 400 without queueing
+            with gate.admit():
+                payload = handle(args)
+        except BadRequest as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+        except Busy as e:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, f"busy: {e}",
+                               {"Retry-After": str(max(1, round(e.retry_after)))})
+        except Exception as e:
+            print(f"API error: {e}")
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+        self._send(HTTPStatus.OK, payload)
+
+    def _check(self, args):
+        with priority(INTERACTIVE):
+            return run_check(self.client, args)
+
+    def _batch(self, args):
+        return run_batch(self.client, *args)
+
+def serve(client, host="127.0.0.1", port=8080):
+    Handler.client = client
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    print(f"Misinformation API listening on http://{host}:{httpd.server_address[1]}")
+    return httpd
+
+def _client(args):
+    client = client_from_args(args, required=False)
+    if client is None:
+        print("GEMINI_API_KEY not set; check endpoints will answer 503 (use --fake for an offline model)")
+    return client
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="JSON HTTP API for headline checks.")
+    ap.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("API_PORT", 8080)))
+    add_client_args(ap)
+    args = ap.parse_args(argv)
+    httpd = serve(_client(args), args.host, args.port)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# article_cache.py - on-disk store of extracted article text, revalidated with conditional GETs
+import os, sqlite3, threading, time
+from collections import namedtuple
+from contextlib import contextmanager
+
+CACHE_PATH = os.getenv("ARTICLE_CACHE_PATH", os.path.join(".cache", "articles.sqlite"))
+FRESH_SECONDS = int(os.getenv("ARTICLE_CACHE_FRESH", 30 * 60))        # served without touching the network
+MAX_AGE = int(os.getenv("ARTICLE_CACHE_MAX_AGE", 3 * 24 * 3600))       # dropped once not revalidated this long
+MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", 20000))
+MAX_BYTES = int(os.getenv("ARTICLE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url           TEXT PRIMARY KEY,
+    text          TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    size          INTEGER NOT NULL,
+    validated     REAL NOT NULL,
+    accessed      REAL NOT NULL
+)
+"""
+
+CachedArticle = namedtuple("CachedArticle", "text etag last_modified validated")
+
+class ArticleCache:
+    """URL-keyed extracted text plus the validators (ETag / Last-Modified) it was served with.
+
+    Rows younger than fresh_seconds are used as-is; older ones are revalidated
+    by the caller with conditional_headers() and kept alive with revalidated()
+    on a 304. Rows not validated for max_age are dropped, and past max_entries
+    or max_bytes the least recently read rows go first.
+    """
+
+    def __init__(self, path=CACHE_PATH, fresh_seconds=FRESH_SECONDS, max_age=MAX_AGE,
+                 max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._ready = False
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @contextmanager
+    def _connect(self):
+        if not self._ready and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(_SCHEMA)
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, url):
+        """Stored article for url (possibly stale; see is_fresh), or None."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT text, etag, last_modified, validated FROM articles WHERE url = ?",
+                               (url,)).fetchone()
+            if row and now - row[3] > self.max_age:
+                conn.execute("DELETE FROM articles WHERE url = ?", (url,))
+                row = None
+            if row:
+                conn.execute("UPDATE articles SET accessed = ? WHERE url = ?", (now, url))
+            else:
+                self.stats["misses"] += 1
+        return CachedArticle(*row) if row else None
+
+    def is_fresh(self, entry):
+        fresh = entry is not None and time.time() - entry.validated < self.fresh_seconds
+        if fresh:
+            with self._lock:
+                self.stats["fresh_hits"] += 1
+        return fresh
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, url):
+        """The origin answered 304: the stored text is current again."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE articles SET validated = ?, accessed = ? WHERE url = ?", (now, now, url))
+            self.stats["revalidated"] += 1
+
+    def put(self, url, text, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO articles (url, text, etag, last_modified, size, validated, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, text, etag, last_modified, len(text.encode("utf-8")), now, now),
+            )
+            self.stats["stores"] += 1
+            self.stats["evictions"] += self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        removed = conn.execute("DELETE FROM articles WHERE validated < ?", (now - self.max_age,)).rowcount
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM articles").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return removed
+        drop = []
+        for url, sz in conn.execute("SELECT url, size FROM articles ORDER BY accessed ASC"):
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            drop.append((url,))
+            count, size = count - 1, size - sz
+        conn.executemany("DELETE FROM articles WHERE url = ?", drop)
+        return removed + len(drop)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM articles")
+
+_default = None
+
+def get_cache() -> ArticleCache:
+    global _default
+    if _default is None:
+        _default = ArticleCache()
+    return _default
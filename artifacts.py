@@ -0,0 +1,53 @@
+# artifacts.py - optional, off-the-hot-path persistence of research evidence
+#
+# Disabled unless EVIDENCE_ARTIFACT_DIR is set. Evidence lists are stored once per
+# distinct content (blobs/<sha256>.json) and every run gets its own uniquely named
+# record pointing at its blob, so concurrent analyses never write the same file.
+import hashlib, json, os, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ARTIFACT_DIR = os.getenv("EVIDENCE_ARTIFACT_DIR", "")
+
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _write(root, kind, headline, payload, digest, run_id, created):
+    blob = os.path.join(root, "blobs", digest[:2], f"{digest}.json")
+    if not os.path.exists(blob):
+        _atomic_write(blob, payload)
+    record = {"run_id": run_id, "kind": kind, "headline": headline, "evidence": digest, "created": created}
+    _atomic_write(os.path.join(root, "runs", created[:10], f"{run_id}.json"),
+                  json.dumps(record, ensure_ascii=False))
+    return blob
+
+def save_evidence(kind, headline, items, root=None):
+    """Queue evidence for background storage; returns a Future of the blob path, or None if disabled.
+
+    Never blocks the caller on disk I/O (the encode is the only work done inline).
+    """
+    root = ARTIFACT_DIR if root is None else root
+    if not root:
+        return None
+    payload = json.dumps(items, ensure_ascii=False, indent=2, sort_keys=True)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    created = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    run_id = f"{created[:19].replace(':', '')}-{uuid.uuid4().hex[:12]}"
+    future = _WRITER.submit(_write, root, kind, headline, payload, digest, run_id, created)
+    future.add_done_callback(_log_failure)
+    return future
+
+def _log_failure(future):
+    if future.exception() is not None:
+        print(f"Artifact write failed: {future.exception()}")
+
+def load_evidence(digest, root=None):
+    root = ARTIFACT_DIR if root is None else root
+    with open(os.path.join(root, "blobs", digest[:2], f"{digest}.json"), encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,99 @@
+# batch_check.py - headless bulk headline checking with resumable JSONL output
+#
+#   python batch_check.py headlines.jsonl --out verdicts.jsonl --workers 8
+#   cat headlines.txt | python batch_check.py - --out verdicts.jsonl --source wiki
+#
+# Input records need a 'headline'; optional 'id' and 'evidence' ("ID|text" lines).
+# Every finished headline is appended (and fsynced) to --out, which is the checkpoint:
+# a restarted run skips ids already written there without an error.
+import argparse, sys, time
+
+from jobs import ResultLog, add_client_args, client_from_args, load_records, run_pool, shard
+from llm_scheduler import BATCH, prioritized
+from pipeline import analyze
+
+def check_one(client, rec, args):
+    t0 = time.perf_counter()
+    out = {"id": rec["id"], "headline": rec["headline"]}
+    try:
+        res = analyze(client, rec["headline"], rec.get("evidence"), rounds=args.rounds,
+                      auto_research=args.source != "none", k=args.k, source=args.source,
+                      token_budget=args.turn_token_budget, reuse=not args.no_reuse,
+                      deadline_s=args.deadline, adaptive=True if args.adaptive else None)
+        out.update({
+            "label": res["label"],
+            "confidence": res["confidence"],
+            "control_label": res["control"].get("label"),
+            "control_confidence": res["control"].get("confidence"),
+            "rationale": res["verdict"].get("rationale"),
+            "evidence_ids": [e.get("id") for e in res["evidence"]],
+            "rounds_run": res["verdict"].get("rounds_run"),
+            "early_exit_reason": res["verdict"].get("early_exit_reason"),
+            "duplicates_collapsed": res["duplicates_collapsed"],
+            "degraded": res["verdict"].get("degraded_reasons", []) if res.get("degraded") else False,
+            "timing": res["timing"],
+            "analyzed_at": res["analyzed_at"],
+        })
+        if res.get("cached"):
+            out["cached"] = res["cached"]
+        if args.transcripts:
+            out["transcript"] = res["transcript"]
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    out["wall_s"] = round(time.perf_counter() - t0, 3)
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check many headlines; results stream to JSONL and runs resume.")
+    ap.add_argument("input", nargs="?", default="-", help="JSONL/CSV/text file, or '-' for stdin")
+    ap.add_argument("--format", choices=["jsonl", "csv", "txt"], help="input format (default: by extension)")
+    ap.add_argument("--out", required=True, help="verdicts JSONL (appended; doubles as the resume log)")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rounds", type=int, default=2)
+    ap.add_argument("--adaptive", action="store_true", help="stop a debate early once it converges")
+    ap.add_argument("--k", type=int, default=5, help="auto-research sources per headline")
+    ap.add_argument("--source", default="news", choices=["news", "wiki", "none"])
+    ap.add_argument("--turn-token-budget", type=int, help="compact debate transcripts to ~N tokens per prompt")
+    ap.add_argument("--deadline", type=float,
+                    help="seconds per headline before partial results are returned (default ANALYSIS_DEADLINE; 0 = none)")
+    ap.add_argument("--no-reuse", action="store_true",
+                    help="always run the full analysis, even for near-identical headlines checked recently")
+    ap.add_argument("--shard", help="i/n: only process every n-th record starting at i")
+    ap.add_argument("--transcripts", action="store_true", help="include debate transcripts in the output")
+    add_client_args(ap)
+    args = ap.parse_args(argv)
+
+    records = shard(load_records(args.input, args.format), args.shard)
+    log = ResultLog(args.out)
+    # errored records are retried on the next run; clean ones are skipped
+    done = {r["id"] for r in log.read() if r.get("id") and not r.get("error")}
+    todo = [r for r in records if r["id"] not in done]
+    print(f"{len(records)} headlines, {len(records) - len(todo)} already done, {len(todo)} to check",
+          file=sys.stderr)
+
+    client = client_from_args(args)
+    t0 = time.perf_counter()
+
+    @prioritized(BATCH)
+    def _one(rec):
+        res = check_one(client, rec, args)
+        log.write(res)
+        return res
+
+    finished = 0
+
+    def _progress(res):
+        nonlocal finished
+        finished += 1
+        status = res.get("error") or f"{res['label']} ({res['confidence']}%)"
+        print(f"[{finished}/{len(todo)}] {res['id']} {res['headline'][:60]} -> {status}",
+              file=sys.stderr)
+
+    results = run_pool(todo, _one, workers=args.workers, on_result=_progress)
+    failed = sum(1 for r in results if r.get("error"))
+    print(f"Checked {len(results)} headlines in {time.perf_counter() - t0:.1f}s ({failed} failed) -> {args.out}",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
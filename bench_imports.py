@@ -0,0 +1,92 @@
+# bench_imports.py - cold-start import cost of each entry point (python -X importtime)
+#
+#   python bench_imports.py                           # table: median import time, heavy deps loaded
+#   python bench_imports.py --json imports.json       # also write the report
+#   python bench_imports.py --baseline imports.json   # exit 1 if an entry point got slower or heavier
+#
+# Every sample is a fresh interpreter, so numbers include everything a CLI/worker process pays
+# before doing any work. HEAVY lists dependencies that should only load on the paths needing them.
+import argparse, json, os, re, statistics, subprocess, sys
+
+ENTRY_POINTS = ["pipeline", "researcher", "news_researcher", "agents2", "batch_check", "benchmark",
+                "api_server", "app2"]
+# none of these may load at import time: each is imported on the first call that needs it
+HEAVY = ["gradio", "google.genai", "trafilatura", "feedparser", "dateparser", "httpx"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def sample(module):
+    """(cumulative import seconds, {imported module: cumulative seconds}) from one cold interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                          capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    loaded, total = {}, 0.0
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cumulative, name = int(m.group(2)) / 1e6, m.group(4)
+        loaded[name] = cumulative
+        if name == module and len(m.group(3)) == 1:
+            total = cumulative
+    return total, loaded
+
+def measure(module, repeats):
+    totals, loaded = [], {}
+    for _ in range(repeats):
+        total, loaded = sample(module)
+        totals.append(total)
+    heavy = {h: round(loaded[h] * 1000, 1) for h in HEAVY if h in loaded}
+    return {
+        "median_ms": round(statistics.median(totals) * 1000, 1),
+        "min_ms": round(min(totals) * 1000, 1),
+        "heavy_loaded": heavy,
+    }
+
+def compare(report, baseline, tolerance):
+    """Entry points whose median grew by more than `tolerance`, or that newly load a heavy dep."""
+    problems = []
+    for name, cur in report["entry_points"].items():
+        base = baseline.get("entry_points", {}).get(name)
+        if not base:
+            continue
+        limit = base["median_ms"] * (1 + tolerance) + 20   # ms of slack for small, noisy imports
+        if cur["median_ms"] > limit:
+            problems.append(f"{name}: {cur['median_ms']}ms > {limit:.0f}ms (baseline {base['median_ms']}ms)")
+        new = set(cur["heavy_loaded"]) - set(base["heavy_loaded"])
+        if new:
+            problems.append(f"{name}: now imports {', '.join(sorted(new))}")
+    return problems
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cold-start import time per entry point.")
+    ap.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--json", help="write the report to this file")
+    ap.add_argument("--baseline", help="compare against a previous --json report")
+    ap.add_argument("--tolerance", type=float, default=0.3, help="allowed median growth vs baseline")
+    args = ap.parse_args(argv)
+
+    report = {"python": sys.version.split()[0], "repeats": args.repeats, "entry_points": {}}
+    print(f"{'entry point':<18}{'median ms':>10}{'min ms':>9}  heavy deps loaded")
+    for module in args.modules:
+        r = report["entry_points"][module] = measure(module, args.repeats)
+        heavy = ", ".join(f"{k} {v:.0f}ms" for k, v in r["heavy_loaded"].items()) or "-"
+        print(f"{module:<18}{r['median_ms']:>10}{r['min_ms']:>9}  {heavy}")
+
+    problems = [f"{m}: imports {', '.join(r['heavy_loaded'])} at startup"
+                for m, r in report["entry_points"].items() if r["heavy_loaded"]]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems += compare(report, json.load(f), args.tolerance)
+    if problems:
+        print("\nREGRESSIONS:\n" + "\n".join(problems))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# bench_pipeline.py - offline latency microbenchmarks for the analysis pipeline
+#
+#   python bench_pipeline.py                          # run_misinfo + analyze_headline, print stage table
+#   python bench_pipeline.py --json bench.json        # also write the report
+#   python bench_pipeline.py --baseline bench.json    # exit 1 if any stage p95 regressed
+#
+# Uses fakes.FakeGeminiClient and fakes.fake_research_http, so no network or API key is needed.
+import argparse, json, os, sys, tempfile, time
+
+import agents2, structured
+from fakes import FakeGeminiClient, fake_research_http
+from llm_scheduler import CallScheduler
+from profiling import PROFILER, percentile
+
+HEADLINE = "Apple releases Vision Pro 2.0"
+EVIDENCE = [{"id": f"R{i}", "text": f"Evidence item {i} about the Vision Pro product line. " * 3}
+            for i in range(1, 9)]
+
+def bench_run_misinfo(iterations, rounds, latency):
+    client = FakeGeminiClient(latency=latency)
+    walls = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        agents2.run_misinfo(client, HEADLINE, EVIDENCE, rounds=rounds)
+        walls.append(time.perf_counter() - t0)
+    return walls, client.calls
+
+def bench_analyze_headline(iterations, rounds, latency, source_type):
+    import app2                      # handlers only; the Gradio UI is built on demand
+    from article_cache import ArticleCache
+    from evidence_cache import EvidenceCache
+    from verdict_store import VerdictStore
+    import article_cache, evidence_cache, verdict_store
+
+    client = FakeGeminiClient(latency=latency)
+    app2.client = client
+    walls = []
+    with tempfile.TemporaryDirectory() as tmp, fake_research_http(latency=latency):
+        for i in range(iterations):
+            # fresh caches each run so research and debate are measured, not cache hits
+            evidence_cache._default = EvidenceCache(path=os.path.join(tmp, f"ev{i}.sqlite"))
+            verdict_store._default = VerdictStore(path=os.path.join(tmp, f"verdicts{i}.sqlite"))
+            article_cache._default = ArticleCache(path=os.path.join(tmp, f"articles{i}.sqlite"))
+            t0 = time.perf_counter()
+            out = app2.analyze_headline(HEADLINE, "", rounds, True, 5, source_type)
+            walls.append(time.perf_counter() - t0)
+            if out[0] == "ERROR":
+                raise RuntimeError(out[1])
+    return walls, client.calls
+
+def _summary(walls, calls, latency, iterations):
+    walls = sorted(walls)
+    model_time = calls * latency / max(1, iterations)   # serial model time per run (upper bound)
+    p50 = percentile(walls, 50)
+    return {
+        "iterations": iterations,
+        "model_calls_per_run": calls / max(1, iterations),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(percentile(walls, 95) * 1000, 3),
+        "p99_ms": round(percentile(walls, 99) * 1000, 3),
+        "overhead_ms": round(max(0.0, p50 - model_time) * 1000, 3),
+    }
+
+def compare(report, baseline, tolerance):
+    """Return human-readable regressions where p95 grew by more than `tolerance` (fraction)."""
+    problems = []
+    for section in ("scenarios", "stages"):
+        for name, cur in report.get(section, {}).items():
+            base = baseline.get(section, {}).get(name)
+            if not base or not base.get("p95_ms"):
+                continue
+            # ignore sub-millisecond jitter on near-free stages
+            limit = base["p95_ms"] * (1 + tolerance) + 0.5
+            if cur["p95_ms"] > limit:
+                problems.append(f"{section}/{name}: p95 {cur['p95_ms']}ms > {limit:.2f}ms (baseline {base['p95_ms']}ms)")
+    return problems
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline pipeline latency benchmarks.")
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--rounds", type=int, default=2)
+    ap.add_argument("--latency", type=float, default=0.01, help="seconds per fake model/HTTP call")
+    ap.add_argument("--source", default="Recent News", choices=["Recent News", "Wikipedia"])
+    ap.add_argument("--skip-app", action="store_true", help="skip analyze_headline (no gradio needed)")
+    ap.add_argument("--json", help="write the report to this file")
+    ap.add_argument("--baseline", help="compare against a previous --json report")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth vs baseline")
+    args = ap.parse_args(argv)
+
+    agents2.set_response_cache(None)   # measure real call paths, not cache hits
+    # keep the scheduler in the path but unlimited: the fake client has no quota to protect
+    agents2.set_call_scheduler(CallScheduler(rpm=0, tpm=0, max_concurrent=0))
+    PROFILER.enabled = True
+    report = {"config": vars(args).copy(), "scenarios": {}}
+
+    walls, calls = bench_run_misinfo(args.iterations, args.rounds, args.latency)
+    report["scenarios"]["run_misinfo"] = _summary(walls, calls, args.latency, args.iterations)
+    if not args.skip_app:
+        walls, calls = bench_analyze_headline(args.iterations, args.rounds, args.latency, args.source)
+        report["scenarios"]["analyze_headline"] = _summary(walls, calls, args.latency, args.iterations)
+    report["stages"] = PROFILER.report()
+    report["structured_output"] = structured.STATS.snapshot()
+
+    for name, s in report["scenarios"].items():
+        print(f"{name}: p50 {s['p50_ms']}ms  p95 {s['p95_ms']}ms  p99 {s['p99_ms']}ms  "
+              f"calls/run {s['model_calls_per_run']}  overhead {s['overhead_ms']}ms")
+    so = report["structured_output"]
+    print(f"verdict parse failures {so['parse_failures']}/{so['parsed'] + so['parse_failures']}  "
+          f"regenerations {so['regenerations']}/{so['agent_turns']} turns")
+    print()
+    print(PROFILER.format_report())
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        if problems:
+            print("\nREGRESSIONS:\n" + "\n".join(problems))
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmark.py - dataset-driven benchmark runner for the debate and control pipelines
+import argparse, json, os, time
+from collections import Counter
+
+from agents2 import run_with_control
+from jobs import ResultLog, add_client_args, client_from_args, load_records, run_pool, shard
+from llm_scheduler import BATCH, prioritized
+from pipeline import parse_evidence
+
+LABELS = ["TRUE", "FALSE", "MIXED", "UNVERIFIED", "ERROR"]
+DEFAULT_CASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_cases.jsonl")
+
+def run_case(client, case, rounds=2, adaptive=None):
+    """Run both pipelines on one case (no auto-research, like the UI benchmark tab)."""
+    expected = str(case.get("expected", "")).upper()
+    rec = {"id": case["id"], "headline": case["headline"], "expected": expected,
+           "description": case.get("description", "")}
+    t0 = time.perf_counter()
+    try:
+        evidence = case.get("evidence") or []
+        if isinstance(evidence, str):   # CSV datasets carry evidence as 'ID|text' lines
+            evidence = parse_evidence(evidence)
+        _, verdict, control, timing = run_with_control(client, case["headline"], evidence, rounds=rounds,
+                                                       adaptive=adaptive)
+        rec["debate_result"] = verdict.get("label", "unverified").upper()
+        rec["control_result"] = control.get("label", "unverified").upper()
+        rec["debate_confidence"] = verdict.get("confidence")
+        rec["control_confidence"] = control.get("confidence")
+        rec["timing"] = timing
+    except Exception as e:
+        rec["debate_result"] = rec["control_result"] = "ERROR"
+        rec["error"] = str(e)
+    rec["debate_correct"] = rec["debate_result"] == expected
+    rec["control_correct"] = rec["control_result"] == expected
+    rec["wall_s"] = round(time.perf_counter() - t0, 3)
+    return rec
+
+def latest(records):
+    """Last record per id, in first-seen order (a retried case replaces its earlier attempt)."""
+    by_id = {}
+    for r in records:
+        if r.get("id"):
+            by_id[r["id"]] = r
+    return list(by_id.values())
+
+def run_benchmark(client, cases, out_path=None, workers=4, rounds=2, resume=True, on_result=None,
+                  adaptive=None):
+    """Run cases with bounded concurrency, streaming each result to out_path.
+
+    With resume, cases already in out_path without an error are skipped and
+    their stored results are returned alongside the new ones; errored cases
+    (rate limits, network failures) are run again.
+    """
+    log = ResultLog(out_path)
+    previous = [r for r in latest(log.read()) if not r.get("error")] if resume else []
+    done = {r["id"] for r in previous}
+    todo = [c for c in cases if c["id"] not in done]
+
+    @prioritized(BATCH)   # interactive checks overtake queued benchmark calls
+    def _one(case):
+        rec = run_case(client, case, rounds=rounds, adaptive=adaptive)
+        log.write(rec)
+        return rec
+
+    fresh = run_pool(todo, _one, workers=workers, on_result=on_result)
+    wanted = {c["id"] for c in cases}
+    return [r for r in previous if r["id"] in wanted] + fresh
+
+def confusion(results, field):
+    """expected -> predicted -> count for one pipeline ('debate_result' / 'control_result')."""
+    m = {e: Counter() for e in LABELS}
+    for r in results:
+        m.setdefault(r["expected"], Counter())[r.get(field, "ERROR")] += 1
+    return {e: dict(c) for e, c in m.items() if c}
+
+def summarize(results):
+    total = len(results) or 1
+    walls = sorted(r.get("wall_s", 0.0) for r in results)
+    return {
+        "cases": len(results),
+        "debate_accuracy": round(sum(r["debate_correct"] for r in results) / total, 4),
+        "control_accuracy": round(sum(r["control_correct"] for r in results) / total, 4),
+        "errors": sum(1 for r in results if r.get("error")),
+        "debate_confusion": confusion(results, "debate_result"),
+        "control_confusion": confusion(results, "control_result"),
+        "wall_s": {
+            "total": round(sum(walls), 3),
+            "mean": round(sum(walls) / total, 3),
+            "p50": walls[len(walls) // 2] if walls else 0.0,
+            "max": walls[-1] if walls else 0.0,
+        },
+    }
+
+def format_report(results):
+    s = summarize(results)
+    lines = [
+        "BENCHMARK RESULTS:",
+        f"Debate Analysis: {s['debate_accuracy'] * 100:.1f}% of {s['cases']} correct",
+        f"Control Analysis: {s['control_accuracy'] * 100:.1f}% of {s['cases']} correct",
+        f"Errors: {s['errors']} | Per-case wall time: mean {s['wall_s']['mean']}s, "
+        f"p50 {s['wall_s']['p50']}s, max {s['wall_s']['max']}s",
+    ]
+    for name in ("debate", "control"):
+        m = s[f"{name}_confusion"]
+        cols = [l for l in LABELS if any(l in row for row in m.values())]
+        lines += ["", f"{name.title()} confusion (rows=expected, cols=predicted):",
+                  "".ljust(12) + "".join(c.ljust(12) for c in cols)]
+        for exp, row in m.items():
+            lines.append(exp.ljust(12) + "".join(str(row.get(c, 0)).ljust(12) for c in cols))
+    return "\n".join(lines)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run misinformation benchmarks from a JSONL/CSV dataset.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run cases and stream results to JSONL")
+    run.add_argument("--cases", default=DEFAULT_CASES, help="JSONL/CSV with headline, expected[, id, description]")
+    run.add_argument("--out", required=True, help="results JSONL (appended to; reused for --resume)")
+    run.add_argument("--workers", type=int, default=4)
+    run.add_argument("--rounds", type=int, default=2)
+    run.add_argument("--adaptive", action="store_true", help="stop a debate early once it converges")
+    run.add_argument("--shard", help="i/n: run every n-th case starting at i (0-based)")
+    run.add_argument("--no-resume", action="store_true", help="re-run cases already in --out")
+    add_client_args(run)
+    rep = sub.add_parser("report", help="summarize one or more results files (e.g. all shards)")
+    rep.add_argument("results", nargs="+")
+    rep.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "report":
+        results = latest(r for path in args.results for r in ResultLog(path).read())
+        print(json.dumps(summarize(results), indent=2) if args.json else format_report(results))
+        return
+
+    cases = shard(load_records(args.cases), args.shard)
+    client = client_from_args(args)
+    t0 = time.perf_counter()
+    results = run_benchmark(
+        client, cases, out_path=args.out, workers=args.workers, rounds=args.rounds,
+        resume=not args.no_resume, adaptive=True if args.adaptive else None,
+        on_result=lambda r: print(f"{r['id']}: {r['headline'][:50]} | expected {r['expected']} | "
+                                  f"debate {r['debate_result']} | control {r['control_result']} | {r['wall_s']}s"),
+    )
+    print()
+    print(format_report(results))
+    print(f"\nWall time: {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
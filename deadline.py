@@ -0,0 +1,124 @@
+# deadline.py - one time budget per analysis, shared by research, debate and judging
+import asyncio, contextvars, os, threading, time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+ANALYSIS_DEADLINE = float(os.getenv("ANALYSIS_DEADLINE", 90))   # seconds per analysis; 0 = unbounded
+JUDGE_RESERVE = float(os.getenv("JUDGE_RESERVE", 8))             # debate stops early to leave the judge this long
+JUDGE_RESERVE_SHARE = 0.25   # ...but never more than this share of the deadline, so short ones still debate
+
+_current = contextvars.ContextVar("deadline", default=None)
+# blocking calls that can't be interrupted (model SDK) run here so the caller can stop waiting
+_CALL_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="deadline")
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class Deadline:
+    """Absolute expiry plus the notes of whatever got cut short on the way."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self.notes = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cap(self, timeout):
+        """timeout, shortened to what's left (raises if nothing is)."""
+        left = self.remaining()
+        if left <= 0:
+            raise DeadlineExceeded(f"{self.seconds:g}s analysis deadline reached")
+        return left if timeout is None else min(timeout, left)
+
+    def judge_reserve(self):
+        """Seconds kept back for the judge: JUDGE_RESERVE, scaled down for short deadlines."""
+        return min(JUDGE_RESERVE, JUDGE_RESERVE_SHARE * self.seconds)
+
+    def shortened(self, seconds):
+        """This deadline pulled `seconds` earlier, sharing its notes (e.g. to keep time for the judge)."""
+        d = Deadline.__new__(Deadline)
+        d.seconds, d.expires = self.seconds, self.expires - seconds
+        d.notes, d._lock = self.notes, self._lock
+        return d
+
+    def note(self, reason):
+        with self._lock:
+            if reason not in self.notes:
+                self.notes.append(reason)
+
+    def mark(self, verdict):
+        """Flag a verdict dict as degraded if anything was cut short. Returns it."""
+        if self.notes and isinstance(verdict, dict):
+            verdict["degraded"] = True
+            verdict["degraded_reasons"] = list(self.notes)
+        return verdict
+
+    def submit(self, fn, *args, **kwargs):
+        """Start fn(*args) in a worker and return its future."""
+        self.cap(None)   # expired: raise before the (billed) request is even sent
+        return _CALL_POOL.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    def result(self, f):
+        """f's result; stop waiting (DeadlineExceeded) when time runs out."""
+        try:
+            return f.result(timeout=self.cap(None))
+        except FutureTimeout:
+            f.cancel()   # the SDK call itself can't be interrupted; its result is dropped
+            raise DeadlineExceeded(f"{self.seconds:g}s analysis deadline reached") from None
+
+    def call(self, fn, *args, **kwargs):
+        """fn(*args) in a worker; stop waiting (DeadlineExceeded) when time runs out."""
+        return self.result(self.submit(fn, *args, **kwargs))
+
+    async def wait(self, aw):
+        """Await aw, cancelling it when time runs out."""
+        try:
+            return await asyncio.wait_for(aw, self.cap(None))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"{self.seconds:g}s analysis deadline reached") from None
+
+def current():
+    return _current.get()
+
+@contextmanager
+def use(dl):
+    """Make dl the ambient deadline (None leaves things unbounded). Inherited by asyncio tasks;
+    thread pools only see it via contextvars.copy_context().run."""
+    token = _current.set(dl)
+    try:
+        yield dl
+    finally:
+        _current.reset(token)
+
+def start(seconds=None):
+    """New Deadline for one analysis; None means ANALYSIS_DEADLINE, 0 means no deadline."""
+    seconds = ANALYSIS_DEADLINE if seconds is None else seconds
+    return Deadline(seconds) if seconds and seconds > 0 else None
+
+# ── Helpers for code that reads the ambient deadline ─────────────────────────
+def cap(timeout):
+    dl = _current.get()
+    return timeout if dl is None else dl.cap(timeout)
+
+def expired():
+    dl = _current.get()
+    return dl is not None and dl.expired()
+
+def note(reason):
+    dl = _current.get()
+    if dl is not None:
+        dl.note(reason)
+
+def cut_off(exc):
+    """True if exc is (or was caused by) the ambient deadline running out, e.g. a capped read timeout."""
+    return isinstance(exc, DeadlineExceeded) or (exc is not None and expired())
+
+def degraded():
+    dl = _current.get()
+    return bool(dl and dl.notes)
@@ -0,0 +1,72 @@
+# dedupe.py - near-duplicate evidence detection with MinHash + LSH banding
+import hashlib, re
+import numpy as np
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+BANDS = 32                 # 32 bands x 2 rows: ~J>=0.3 pairs become candidates
+SIMILARITY = 0.6           # estimated Jaccard at/above which two items are the same story
+_ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240914)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+def _shingles(text):
+    words = _WORD.findall((text or "").lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def minhash(text):
+    """NUM_PERM-value MinHash signature of the text's word shingles (vectorized over shingles)."""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    x = np.fromiter((int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=7).digest(), "big")
+                     for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a*x + b) mod p, with uint64 wraparound standing in for the modular multiply
+    return ((x[:, None] * _A[None, :] + _B[None, :]) % np.uint64(_PRIME)).min(axis=0)
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+def _body(item):
+    # compare article bodies, not titles: syndicated copies differ in the " - Outlet" suffix
+    if isinstance(item, dict):
+        return item.get("text") or item.get("summary") or item.get("title", "")
+    return str(item)
+
+def collapse_duplicates(items, text=_body, threshold=SIMILARITY):
+    """Drop near-duplicate items, keeping the first of each cluster (so earlier sources win).
+
+    Each kept item that absorbed others gets a 'duplicates' count. Returns
+    (kept_items, number_collapsed). LSH band buckets keep this linear in len(items).
+    """
+    buckets, sigs, kept, collapsed = {}, [], [], 0
+    for it in items:
+        sig = minhash(text(it))
+        bands = [(b, sig[b * _ROWS:(b + 1) * _ROWS].tobytes()) for b in range(BANDS)]
+        seen, match = set(), None
+        for band in bands:
+            for idx in buckets.get(band, ()):
+                if idx not in seen:
+                    seen.add(idx)
+                    if similarity(sigs[idx], sig) >= threshold:
+                        match = idx
+                        break
+            if match is not None:
+                break
+        if match is not None:
+            keeper = kept[match]
+            if isinstance(keeper, dict):
+                keeper["duplicates"] = keeper.get("duplicates", 0) + 1
+            collapsed += 1
+            continue
+        for band in bands:
+            buckets.setdefault(band, []).append(len(kept))
+        sigs.append(sig)
+        kept.append(it)
+    return kept, collapsed
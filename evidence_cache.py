@@ -0,0 +1,150 @@
+# evidence_cache.py - on-disk TTL cache for research evidence lists
+import asyncio, json, os, re, sqlite3, threading, time
+from contextlib import contextmanager
+import deadline
+
+CACHE_PATH = os.getenv("EVIDENCE_CACHE_PATH", os.path.join(".cache", "evidence.sqlite"))
+
+# News goes stale fast; encyclopedia summaries barely move.
+TTL_SECONDS = {
+    "news": int(os.getenv("EVIDENCE_TTL_NEWS", 15 * 60)),
+    "wiki": int(os.getenv("EVIDENCE_TTL_WIKI", 3 * 24 * 3600)),
+}
+MAX_ENTRIES = int(os.getenv("EVIDENCE_CACHE_MAX_ENTRIES", 5000))
+MAX_BYTES = int(os.getenv("EVIDENCE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    key      TEXT PRIMARY KEY,
+    source   TEXT NOT NULL,
+    payload  TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+def normalize_headline(headline: str) -> str:
+    """Case/punctuation/whitespace-insensitive form used for cache keys."""
+    h = (headline or "").lower()
+    h = re.sub(r"[^\w\s]", " ", h)
+    return re.sub(r"\s+", " ", h).strip()
+
+class EvidenceCache:
+    """SQLite-backed evidence cache keyed by (normalized headline, source, k).
+
+    Entries expire per source TTL; once the table exceeds max_entries or
+    max_bytes the least recently read rows are evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = path
+        self.ttl = dict(TTL_SECONDS, **(ttl or {}))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._ready = False
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    @contextmanager
+    def _connect(self):
+        if not self._ready and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(_SCHEMA)
+                self._ready = True
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(source, headline, k):
+        return f"{source}|{int(k)}|{normalize_headline(headline)}"
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def get(self, source, headline, k):
+        key, now = self.key(source, headline, k), time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT payload, created FROM evidence WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl.get(source, 0):
+                conn.execute("DELETE FROM evidence WHERE key = ?", (key,))
+                self.stats["expired"] += 1
+                row = None
+            if row:
+                conn.execute("UPDATE evidence SET accessed = ? WHERE key = ?", (now, key))
+        if not row:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    def put(self, source, headline, k, items):
+        payload = json.dumps(items, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO evidence (key, source, payload, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.key(source, headline, k), source, payload, len(payload), now, now),
+            )
+            self.stats["stores"] += 1
+            self.stats["evictions"] += self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        removed = 0
+        for source, ttl in self.ttl.items():
+            removed += conn.execute(
+                "DELETE FROM evidence WHERE source = ? AND created < ?", (source, now - ttl)
+            ).rowcount
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM evidence").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return removed
+        # walk rows oldest-read first until both bounds hold
+        drop = []
+        for key, sz in conn.execute("SELECT key, size FROM evidence ORDER BY accessed ASC"):
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            drop.append((key,))
+            count, size = count - 1, size - sz
+        conn.executemany("DELETE FROM evidence WHERE key = ?", drop)
+        return removed + len(drop)
+
+    def fetch(self, source, headline, k, build):
+        """Return cached evidence, or call build() and cache its result."""
+        items = self.get(source, headline, k)
+        if items is not None:
+            return items
+        items = build()
+        # don't pin placeholder results (e.g. "No recent news found") or deadline-truncated ones for a whole TTL
+        if any(it.get("source") not in (None, "none") for it in items) and not deadline.degraded():
+            self.put(source, headline, k, items)
+        return items
+
+    async def fetch_async(self, source, headline, k, build):
+        """Async fetch(); build is a zero-arg coroutine function. SQLite I/O runs in a thread."""
+        items = await asyncio.to_thread(self.get, source, headline, k)
+        if items is not None:
+            return items
+        items = await build()
+        if any(it.get("source") not in (None, "none") for it in items) and not deadline.degraded():
+            await asyncio.to_thread(self.put, source, headline, k, items)
+        return items
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM evidence")
+
+_default = None
+
+def get_cache() -> EvidenceCache:
+    global _default
+    if _default is None:
+        _default = EvidenceCache()
+    return _default
@@ -0,0 +1,166 @@
+# fakes.py - offline stand-ins for the Gemini client (benchmarks, dry runs)
+import asyncio, hashlib, json, re, threading, time
+from contextlib import contextmanager
+from unittest import mock
+
+LABELS = ["true", "false", "mixed", "unverified"]
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        return _Response(self._owner._answer(model, contents, config))
+
+    def generate_content_stream(self, model, contents, config=None):
+        text = self._owner._answer(model, contents, config)
+        words = text.split(" ")
+        for i, w in enumerate(words):
+            yield _Response(w + (" " if i < len(words) - 1 else ""))
+
+class _FakeAsyncModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        if self._owner.latency:
+            await asyncio.sleep(self._owner.latency)
+        return _Response(self._owner._answer(model, contents, config, sleep=False))
+
+    async def generate_content_stream(self, model, contents, config=None):
+        text = self._owner._answer(model, contents, config, sleep=False)
+        words = text.split(" ")
+        for i, w in enumerate(words):
+            if self._owner.latency:
+                await asyncio.sleep(self._owner.latency / len(words))
+            yield _Response(w + (" " if i < len(words) - 1 else ""))
+
+class _FakeAio:
+    def __init__(self, owner):
+        self.models = _FakeAsyncModels(owner)
+
+class FakeGeminiClient:
+    """Deterministic in-process replacement for genai.Client.
+
+    Verdict prompts (judge/control) get JSON whose label is derived from a hash
+    of the headline; debate prompts get a short role-shaped argument citing the
+    first evidence ID. `latency` seconds are slept per call to mimic a model.
+    """
+
+    def __init__(self, latency=0.0, seed="fake"):
+        self.latency = latency
+        self.seed = seed
+        self.models = _FakeModels(self)
+        self.aio = _FakeAio(self)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, model, contents, config, sleep=True):
+        with self._lock:
+            self.calls += 1
+        if sleep and self.latency:
+            time.sleep(self.latency)
+        prompt = contents if isinstance(contents, str) else str(contents)
+        m = re.search(r"Headline(?: to evaluate)?:\s*\n?(.+)", prompt)
+        headline = m.group(1).strip() if m else prompt[:80]
+        digest = hashlib.sha1(f"{self.seed}|{headline}".encode("utf-8")).digest()
+        ids = re.findall(r"\bR\d+\b", prompt) or ["R1"]
+        if "JSON" in prompt:
+            return json.dumps({
+                "label": LABELS[digest[0] % len(LABELS)],
+                "confidence": 50 + digest[1] % 50,
+                "rationale": f"Stand-in verdict based on {ids[0]}.",
+            })
+        side = "supports" if "Verifier" in prompt[:40] else "does not establish"
+        turn = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:6]  # differs per turn
+        return (f"Claims: {ids[0]} {side} the headline ({turn}).\n"
+                f"Support (cite IDs): {ids[0]}\n"
+                f"Rebuttal targets (quote + ID): <rebut>opponent overreads {ids[-1]}</rebut>")
+
+# ── Fake research HTTP ───────────────────────────────────────────────────────
+class _FakeHTTPResponse:
+    def __init__(self, payload=None, status_code=200, text=""):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+class _FeedEntry(dict):
+    __getattr__ = dict.get
+
+def _fake_response(url, params, headers=None):
+    if "wikipedia.org" not in url:
+        # feed bodies are ignored (feedparser.parse is patched); anything else is an article page,
+        # with a stable ETag so conditional requests get 304s like a real origin
+        etag = '"%s"' % hashlib.md5(url.encode()).hexdigest()[:16]
+        if (headers or {}).get("If-None-Match") == etag:
+            r = _FakeHTTPResponse(status_code=304)
+        else:
+            r = _FakeHTTPResponse(text=f"<html><body><p>Full article text for {url}.</p></body></html>")
+        r.headers["ETag"] = etag
+        return r
+    if params and params.get("prop") == "extracts":
+        titles = params["titles"].split("|")
+        pages = {str(i): {"title": t, "extract": f"{t} is a topic with a documented history. " * 4}
+                 for i, t in enumerate(titles)}
+        return _FakeHTTPResponse({"query": {"pages": pages}})
+    q = re.search(r"srsearch=([^&]+)", url)
+    q = q.group(1) if q else "topic"
+    hits = [{"title": f"{q} article {n}"} for n in range(3)]
+    return _FakeHTTPResponse({"query": {"search": hits}})
+
+def _fake_get(latency):
+    def get(url, params=None, headers=None, timeout=None, **kw):
+        if latency:
+            time.sleep(latency)
+        return _fake_response(url, params, headers)
+    return get
+
+def _fake_get_async(latency):
+    async def get(url, params=None, headers=None, timeout=None, **kw):
+        if latency:
+            await asyncio.sleep(latency)
+        return _fake_response(url, params, headers)
+    return get
+
+def _fake_feed(entries):
+    def parse(url_or_bytes, *a, **kw):
+        today = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())
+        return _FeedEntry(entries=[
+            _FeedEntry(link=f"https://news{n % 4}.example.com/story/{n}",
+                       title=f"Outlet {n} reports on the story",
+                       summary=f"Summary {n} of the reported story.",
+                       published=today, published_parsed=time.gmtime())
+            for n in range(entries)
+        ])
+    return parse
+
+@contextmanager
+def fake_research_http(latency=0.0, feed_entries=20):
+    """Patch the shared HTTP layer (and feed/article parsing) with canned responses.
+
+    Every simulated request sleeps `latency` seconds, so concurrency and
+    caching behave as they would against real endpoints, just offline.
+    """
+    import http_client
+
+    def extract(html, *a, **kw):
+        return re.sub(r"<[^>]+>", " ", html or "")
+
+    with mock.patch.object(http_client, "get", _fake_get(latency)), \
+         mock.patch.object(http_client, "get_async", _fake_get_async(latency)), \
+         mock.patch("feedparser.parse", _fake_feed(feed_entries)), \
+         mock.patch("trafilatura.extract", extract):
+        yield
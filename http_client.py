@@ -0,0 +1,131 @@
+# http_client.py - one pooled, retrying HTTP layer for all research I/O
+#
+# Wikipedia search/extracts, the Google News feed and article downloads all go
+# through the same keep-alive pools, so TCP + TLS setup is paid once per host.
+from __future__ import annotations
+import asyncio, os, random, threading, weakref
+import requests, urllib3
+import deadline
+from typing import TYPE_CHECKING
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    import httpx
+
+USER_AGENT = "ai-misinfo/0.3 (contact: you@example.com)"
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 15))
+RETRIES = int(os.getenv("HTTP_RETRIES", 2))   # retries after the first attempt
+BACKOFF = 0.3            # seconds, doubled per retry
+BACKOFF_JITTER = 0.3     # up to this much random extra per retry, so retries from a burst spread out
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_AFTER_MAX = 30.0   # seconds; a longer server Retry-After is cut to this
+POOL_HOSTS = 32          # distinct hosts kept alive at once
+PER_HOST_CONNECTIONS = 4 # open connections to any one host
+MAX_CONNECTIONS = 64     # async client, all hosts
+
+# article hosts are fetched with verify=False (as trafilatura's no_ssl did); don't warn per request
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+class _DeadlineRetry(Retry):
+    """Retry that, like get_async(), never waits past the ambient analysis deadline.
+
+    A retry whose wait (Retry-After or backoff) would outlast the deadline is not
+    attempted: the last response is returned, or the connection error raised.
+    """
+
+    def get_retry_after(self, response):
+        delay = super().get_retry_after(response)
+        return None if delay is None else min(delay, RETRY_AFTER_MAX)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new = super().increment(method, url, response, error, _pool, _stacktrace)
+        dl = deadline.current()
+        if dl is not None:
+            wait = ((response is not None and new.respect_retry_after_header and new.get_retry_after(response))
+                    or new.get_backoff_time())
+            if dl.remaining() <= wait:
+                reason = error or ResponseError(f"retry would outlast the deadline ({response and response.status})")
+                raise MaxRetryError(_pool, url, reason) from reason
+        return new
+
+def _retry():
+    return _DeadlineRetry(total=RETRIES, connect=RETRIES, read=RETRIES, status=RETRIES,
+                 backoff_factor=BACKOFF, backoff_jitter=BACKOFF_JITTER,
+                 status_forcelist=RETRY_STATUS, allowed_methods=frozenset({"GET", "HEAD"}),
+                 respect_retry_after_header=True, raise_on_status=False)
+
+def make_session():
+    s = requests.Session()
+    # pool_block: a host at its connection cap makes callers wait instead of opening throwaway sockets
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=PER_HOST_CONNECTIONS,
+                          pool_block=True, max_retries=_retry())
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers["User-Agent"] = USER_AGENT
+    return s
+
+_session = None
+_session_lock = threading.Lock()
+
+def session() -> requests.Session:
+    """Process-wide requests.Session (thread-safe for the GETs we issue)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+def get(url, params=None, headers=None, timeout=None, verify=True):
+    """GET through the shared session. `timeout` caps the read; connects use CONNECT_TIMEOUT.
+
+    Both are shortened to the ambient analysis deadline, if one is set.
+    """
+    return session().get(url, params=params, headers=headers, verify=verify,
+                         timeout=(deadline.cap(CONNECT_TIMEOUT), deadline.cap(timeout or READ_TIMEOUT)))
+
+# ── Async ────────────────────────────────────────────────────────────────────
+# httpx clients are bound to the event loop that first used them, so keep one per loop.
+# httpx's transport retries only cover connection failures; get_async() adds the status retries.
+# httpx itself is imported on first async use: sync-only processes never pay for it.
+_async_clients = weakref.WeakKeyDictionary()   # loop -> {verify: AsyncClient}
+
+def async_client(verify=True) -> httpx.AsyncClient:
+    import httpx
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if verify not in clients:
+        # pool limits and verify live on the transport once one is passed in
+        transport = httpx.AsyncHTTPTransport(
+            verify=verify, retries=RETRIES,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=POOL_HOSTS * PER_HOST_CONNECTIONS))
+        clients[verify] = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT}, follow_redirects=True, transport=transport,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT))
+    return clients[verify]
+
+async def aclose():
+    """Close this loop's async clients (for scripts that start and stop their own loop)."""
+    for c in _async_clients.pop(asyncio.get_running_loop(), {}).values():
+        await c.aclose()
+
+async def get_async(url, params=None, headers=None, timeout=None, verify=True):
+    """Async GET over the loop's shared client, retrying RETRY_STATUS with jittered backoff."""
+    import httpx
+    http = async_client(verify)
+    for attempt in range(RETRIES + 1):
+        r = await http.get(url, params=params, headers=headers,
+                           timeout=httpx.Timeout(deadline.cap(timeout or READ_TIMEOUT),
+                                                 connect=deadline.cap(CONNECT_TIMEOUT)))
+        if r.status_code not in RETRY_STATUS or attempt == RETRIES:
+            return r
+        delay = r.headers.get("Retry-After")
+        delay = min(float(delay), RETRY_AFTER_MAX) if delay and delay.isdigit() else BACKOFF * 2 ** attempt
+        delay += random.uniform(0, BACKOFF_JITTER)
+        left = deadline.cap(None)
+        if left is not None and left <= delay:
+            return r
+        await asyncio.sleep(delay)
@@ -0,0 +1,134 @@
+# jobs.py - shared plumbing for bulk runs: record loading, JSONL result logs, worker pools, model client
+import csv, hashlib, io, json, os, sys, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def record_id(headline: str) -> str:
+    """Stable id for records that don't carry one, so resumes survive reordering."""
+    return hashlib.sha1(headline.strip().lower().encode("utf-8")).hexdigest()[:12]
+
+def load_records(path=None, fmt=None):
+    """Read records from a JSONL/CSV/plain-text file, or stdin when path is None or '-'.
+
+    JSONL lines and CSV rows must carry a 'headline' field; plain text is one
+    headline per line. Every record gets an 'id' (kept if present).
+    """
+    if path in (None, "-"):
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    if fmt is None:
+        ext = os.path.splitext(path or "")[1].lower()
+        if ext in (".jsonl", ".json"):
+            fmt = "jsonl"
+        elif ext == ".csv":
+            fmt = "csv"
+        else:  # sniff stdin / unknown extensions
+            first = text.lstrip()[:1]
+            fmt = "jsonl" if first == "{" else "txt"
+
+    if fmt == "jsonl":
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    elif fmt == "csv":
+        rows = [dict(r) for r in csv.DictReader(io.StringIO(text))]
+    else:
+        rows = [{"headline": line.strip()} for line in text.splitlines() if line.strip()]
+
+    out = []
+    for r in rows:
+        headline = (r.get("headline") or "").strip()
+        if not headline:
+            continue
+        r["headline"] = headline
+        r["id"] = str(r.get("id") or record_id(headline))
+        out.append(r)
+    return out
+
+def shard(records, spec=None):
+    """Keep this worker's slice of records; spec is 'i/n' (0-based), e.g. '2/8'."""
+    if not spec:
+        return records
+    i, n = (int(x) for x in spec.split("/"))
+    if not 0 <= i < n:
+        raise ValueError(f"bad shard spec {spec!r}")
+    return [r for idx, r in enumerate(records) if idx % n == i]
+
+class ResultLog:
+    """Append-only JSONL results file; one flushed line per finished record.
+
+    Records already present (by id) are reported by done_ids() so a restarted
+    run can skip them. A truncated last line from a crash is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._checked_tail = False
+
+    def read(self):
+        if not self.path or not os.path.exists(self.path):
+            return []
+        out = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+        return out
+
+    def done_ids(self):
+        return {r.get("id") for r in self.read()}
+
+    def write(self, rec):
+        if not self.path:
+            return
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._checked_tail:
+                # a crash mid-write leaves an unterminated line; start ours on a fresh one
+                if os.path.exists(self.path) and os.path.getsize(self.path):
+                    with open(self.path, "rb") as f:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            line = "\n" + line
+                self._checked_tail = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+def run_pool(records, fn, workers=4, on_result=None):
+    """Apply fn to every record with bounded concurrency; results come back in input order."""
+    results = [None] * len(records)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(fn, r): i for i, r in enumerate(records)}
+        for fut in as_completed(futures):
+            res = fut.result()
+            results[futures[fut]] = res
+            if on_result:
+                on_result(res)
+    return results
+
+# ── Model client ─────────────────────────────────────────────────────────────
+def add_client_args(ap):
+    ap.add_argument("--fake", action="store_true", help="use the offline FakeGeminiClient")
+    ap.add_argument("--fake-latency", type=float, default=0.0, help="seconds per fake model call")
+
+def client_from_args(args, required=True):
+    """FakeGeminiClient for --fake, else a Gemini client from GEMINI_API_KEY (.env is read).
+
+    Without a key: exits when required, otherwise returns None.
+    """
+    if args.fake:
+        from fakes import FakeGeminiClient
+        return FakeGeminiClient(latency=args.fake_latency)
+    from dotenv import load_dotenv
+    from agents2 import make_client
+    load_dotenv()
+    key = os.getenv("GEMINI_API_KEY")
+    if not key:
+        if required:
+            raise SystemExit("GEMINI_API_KEY not set (use --fake for an offline stand-in model)")
+        return None
+    return make_client(key)
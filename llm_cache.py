@@ -0,0 +1,81 @@
+# llm_cache.py - response cache for low-temperature Gemini calls
+import hashlib, os, sqlite3, threading, time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 1024))
+DISK_PATH = os.getenv("LLM_CACHE_PATH")          # unset -> memory tier only
+DISK_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+
+def cache_key(model: str, temperature: float, prompt: str) -> str:
+    h = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}|{float(temperature):.3f}|{h}"
+
+class ResponseCache:
+    """Two-tier cache: in-process LRU in front of an optional SQLite file."""
+
+    def __init__(self, max_entries=MEMORY_ENTRIES, disk_path=DISK_PATH, disk_ttl=DISK_TTL):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_ttl = disk_ttl
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_ready = False
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    @contextmanager
+    def _disk(self):
+        if not self._disk_ready and os.path.dirname(self.disk_path):
+            os.makedirs(os.path.dirname(self.disk_path), exist_ok=True)
+        conn = sqlite3.connect(self.disk_path, timeout=10)
+        try:
+            if not self._disk_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                             "(key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL)")
+                self._disk_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key, text):
+        self._mem[key] = text
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._mem[key]
+        if self.disk_path:
+            with self._disk() as conn:
+                row = conn.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and time.time() - row[1] <= self.disk_ttl:
+                with self._lock:
+                    self._remember(key, row[0])
+                    self.stats["disk_hits"] += 1
+                return row[0]
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+            self.stats["stores"] += 1
+        if self.disk_path:
+            with self._disk() as conn:
+                conn.execute("INSERT OR REPLACE INTO responses (key, text, created) VALUES (?, ?, ?)",
+                             (key, text, time.time()))
+                conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.disk_ttl,))
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+        if self.disk_path:
+            with self._disk() as conn:
+                conn.execute("DELETE FROM responses")
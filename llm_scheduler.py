@@ -0,0 +1,352 @@
+# llm_scheduler.py - admission control for Gemini calls: rate limits, concurrency, priorities
+import asyncio, contextvars, functools, heapq, inspect, itertools, os, random, re, threading, time
+from contextlib import asynccontextmanager, contextmanager
+
+REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_RPM", 60))          # 0 = unlimited
+TOKENS_PER_MINUTE = float(os.getenv("GEMINI_TPM", 1_000_000))     # 0 = unlimited
+MAX_CONCURRENT = int(os.getenv("GEMINI_MAX_CONCURRENT", 8))       # calls in flight at once
+QUOTA_RETRIES = int(os.getenv("GEMINI_QUOTA_RETRIES", 3))         # re-queues after a 429
+QUOTA_BACKOFF = 2.0            # seconds before the first retry when the error gives no delay
+OUTPUT_TOKENS_ESTIMATE = 400   # reserved per call until the real usage is known
+CHARS_PER_TOKEN = 4
+
+# Priority classes: lower runs first. A waiting INTERACTIVE call (Quick Check, UI
+# analyses) always goes ahead of queued BATCH work (benchmarks, batch_check).
+INTERACTIVE, DEFAULT, BATCH = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", DEFAULT: "default", BATCH: "batch"}
+
+_priority = contextvars.ContextVar("llm_priority", default=DEFAULT)
+
+@contextmanager
+def priority(level):
+    """Ambient priority for model calls made inside (threads see it via contextvars.copy_context)."""
+    token = _priority.set(level)
+    try:
+        yield level
+    finally:
+        _priority.reset(token)
+
+def prioritized(level):
+    """Decorator running a handler's model calls at `level` (plain, async and async-generator functions).
+
+    Async generators get the priority around each step rather than across yields,
+    since a framework may resume them from a different task.
+    """
+    def wrap(fn):
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def agen(*args, **kwargs):
+                it = fn(*args, **kwargs)
+                while True:
+                    with priority(level):
+                        try:
+                            item = await it.__anext__()
+                        except StopAsyncIteration:
+                            return
+                    yield item
+            return agen
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def coro(*args, **kwargs):
+                with priority(level):
+                    return await fn(*args, **kwargs)
+            return coro
+
+        @functools.wraps(fn)
+        def plain(*args, **kwargs):
+            with priority(level):
+                return fn(*args, **kwargs)
+        return plain
+    return wrap
+
+def estimate_tokens(prompt_text):
+    return len(prompt_text) // CHARS_PER_TOKEN + OUTPUT_TOKENS_ESTIMATE
+
+def usage_tokens(resp):
+    """Total tokens the API billed for a response, or None if it didn't say."""
+    meta = getattr(resp, "usage_metadata", None)
+    return getattr(meta, "total_token_count", None) if meta is not None else None
+
+_RETRY_DELAY = re.compile(r"retry(?:Delay|[ _-]after)['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s", re.I)
+
+def quota_delay(exc):
+    """Seconds to back off if exc is a rate-limit/quota error (0.0 if it gives no hint), else None."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    msg = str(exc)
+    if code != 429 and "RESOURCE_EXHAUSTED" not in msg:
+        return None
+    m = _RETRY_DELAY.search(msg)
+    return float(m.group(1)) if m else 0.0
+
+class TokenBucket:
+    """`rate` units per minute, holding at most `capacity` (default: one minute's worth)."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.level = self.capacity
+        self._stamp = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self.rate / 60.0)
+        self._stamp = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 if it is now)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        short = min(amount, self.capacity) - self.level
+        return 0.0 if short <= 0 else short * 60.0 / self.rate
+
+    def take(self, amount):
+        if self.rate:
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        # a negative amount charges usage beyond the estimate (the level may go below zero)
+        if self.rate:
+            self.level = min(self.capacity, self.level + amount)
+
+class _Waiter:
+    __slots__ = ("cost", "level", "granted", "cancelled", "queued_at", "_event", "_loop")
+
+    def __init__(self, cost, level, loop=None):
+        self.cost, self.level = cost, level
+        self.granted = self.cancelled = False
+        self.queued_at = time.monotonic()
+        self._loop = loop
+        self._event = asyncio.Event() if loop else threading.Event()
+
+    def wake(self):
+        if self._loop is None:
+            self._event.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event.set)
+
+class CallScheduler:
+    """Admits model calls in priority order, within RPM/TPM token buckets and a concurrency cap.
+
+    Shared by every thread and event loop in the process. A quota error pauses
+    all admissions for the delay the API asked for (or an exponential backoff),
+    then the failed call is re-queued. stats() reports queue depth per class.
+    """
+
+    def __init__(self, rpm=REQUESTS_PER_MINUTE, tpm=TOKENS_PER_MINUTE, max_concurrent=MAX_CONCURRENT,
+                 quota_retries=QUOTA_RETRIES):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrent = max_concurrent
+        self.quota_retries = quota_retries
+        self._lock = threading.Lock()
+        self._queue = []                # heap of (level, seq, waiter)
+        self._seq = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0
+        self._counters = {"admitted": 0, "throttled": 0, "quota_errors": 0, "timed_out": 0,
+                          "wait_s": 0.0, "max_queue": 0}
+        self._waiting = {level: 0 for level in PRIORITY_NAMES}
+
+    # ── Admission ────────────────────────────────────────────────────────────
+    def _dispatch(self):
+        """Grant queued waiters that fit now (caller holds the lock); seconds until the head could go."""
+        while self._queue:
+            _, _, head = self._queue[0]
+            if head.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if self.max_concurrent and self._active >= self.max_concurrent:
+                return None   # woken by the next release instead
+            now = time.monotonic()
+            delay = max(self._paused_until - now, self.requests.wait_time(1, now),
+                        self.tokens.wait_time(head.cost, now))
+            if delay > 0:
+                return delay
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(head.cost)
+            self._active += 1
+            self._waiting[head.level] -= 1
+            self._counters["admitted"] += 1
+            self._counters["wait_s"] += now - head.queued_at
+            head.granted = True
+            head.wake()
+        return None
+
+    def _enqueue(self, waiter):
+        with self._lock:
+            heapq.heappush(self._queue, (waiter.level, next(self._seq), waiter))
+            self._waiting[waiter.level] += 1
+            self._counters["max_queue"] = max(self._counters["max_queue"], len(self._queue))
+            return self._dispatch()
+
+    def _poll(self):
+        with self._lock:
+            return self._dispatch()
+
+    def _redispatch(self):
+        """_dispatch after a slot or queue change (caller holds the lock).
+
+        A waiter parked on the concurrency cap waits without a timeout, so if the
+        head is now held back only by the rate buckets, wake it to re-poll and
+        wait out that delay itself.
+        """
+        if self._dispatch() and self._queue:
+            self._queue[0][2].wake()
+
+    def _abandon(self, waiter):
+        """The caller stopped waiting (deadline, cancellation): leave the queue or hand the slot back."""
+        with self._lock:
+            if waiter.granted:
+                self._release(waiter.cost, None)
+            elif not waiter.cancelled:
+                waiter.cancelled = True
+                self._waiting[waiter.level] -= 1
+                self._counters["timed_out"] += 1
+            self._redispatch()
+
+    def _release(self, cost, used):
+        # caller holds the lock
+        self._active -= 1
+        if used is not None:
+            self.tokens.give_back(cost - used)
+
+    def release(self, cost, used=None):
+        with self._lock:
+            self._release(cost, used)
+            self._redispatch()
+
+    @staticmethod
+    def _wait_timeout(delay, deadline):
+        # deadline.cap raises DeadlineExceeded once nothing is left
+        return delay if deadline is None else deadline.cap(delay)
+
+    def acquire(self, cost, level=None, deadline=None):
+        """Block until this call may go; raises deadline.DeadlineExceeded if the deadline runs out first."""
+        waiter = _Waiter(cost, _priority.get() if level is None else level)
+        delay = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                if delay:
+                    with self._lock:
+                        self._counters["throttled"] += 1
+                waiter._event.wait(self._wait_timeout(delay, deadline))
+                waiter._event.clear()
+                delay = self._poll()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return waiter
+
+    async def acquire_async(self, cost, level=None, deadline=None):
+        waiter = _Waiter(cost, _priority.get() if level is None else level, asyncio.get_running_loop())
+        delay = self._enqueue(waiter)
+        try:
+            while not waiter.granted:
+                if delay:
+                    with self._lock:
+                        self._counters["throttled"] += 1
+                try:
+                    await asyncio.wait_for(waiter._event.wait(), self._wait_timeout(delay, deadline))
+                except asyncio.TimeoutError:
+                    pass
+                waiter._event.clear()
+                delay = self._poll()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return waiter
+
+    @contextmanager
+    def slot(self, cost, level=None, deadline=None):
+        self.acquire(cost, level, deadline)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    @asynccontextmanager
+    async def slot_async(self, cost, level=None, deadline=None):
+        await self.acquire_async(cost, level, deadline)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    # ── Quota-aware calls ────────────────────────────────────────────────────
+    def _backoff(self, exc, attempt, deadline):
+        """Pause admissions after a quota error; returns False when the call should give up."""
+        delay = quota_delay(exc)
+        if delay is None:
+            return False
+        delay = delay or QUOTA_BACKOFF * (2 ** attempt) * random.uniform(0.8, 1.2)
+        with self._lock:
+            self._counters["quota_errors"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if attempt >= self.quota_retries or (deadline is not None and deadline.remaining() <= delay):
+            return False
+        return True
+
+    def _release_done(self, cost, f):
+        used = usage_tokens(f.result()) if not f.cancelled() and f.exception() is None else None
+        self.release(cost, used)
+
+    def _run(self, fn, cost, deadline):
+        """fn() in an acquired slot, which is released only once fn has really finished.
+
+        With a deadline, fn runs on the deadline's worker pool and the caller may
+        stop waiting first; the abandoned request still holds its slot until it
+        returns, so max_concurrent bounds the requests actually in flight.
+        """
+        if deadline is None:
+            used = None
+            try:
+                resp = fn()
+                used = usage_tokens(resp)
+                return resp
+            finally:
+                self.release(cost, used)
+        try:
+            f = deadline.submit(fn)
+        except BaseException:
+            self.release(cost)
+            raise
+        f.add_done_callback(functools.partial(self._release_done, cost))
+        return deadline.result(f)
+
+    def call(self, fn, cost, level=None, deadline=None):
+        """fn() once admitted; quota errors re-queue it behind the pause they triggered."""
+        for attempt in itertools.count():
+            self.acquire(cost, level, deadline)
+            try:
+                return self._run(fn, cost, deadline)
+            except Exception as e:
+                if not self._backoff(e, attempt, deadline):
+                    raise
+
+    async def call_async(self, make_call, cost, level=None, deadline=None):
+        """Async call(): make_call() builds a fresh awaitable per attempt."""
+        for attempt in itertools.count():
+            await self.acquire_async(cost, level, deadline)
+            used = None
+            try:
+                resp = await make_call()
+                used = usage_tokens(resp)
+                return resp
+            except Exception as e:
+                if not self._backoff(e, attempt, deadline):
+                    raise
+            finally:
+                self.release(cost, used)
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+            out["wait_s"] = round(out["wait_s"], 3)
+            out["active"] = self._active
+            out["queued"] = {PRIORITY_NAMES[k]: v for k, v in self._waiting.items()}
+            out["queue_depth"] = sum(self._waiting.values())
+            out["paused_s"] = round(max(0.0, self._paused_until - time.monotonic()), 3)
+            out["mean_wait_s"] = round(self._counters["wait_s"] / max(1, self._counters["admitted"]), 3)
+        return out
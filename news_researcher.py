@@ -1,13 +1,46 @@
 # news_researcher.py
-import feedparser, trafilatura, json, re, time
-from urllib.parse import quote
+import asyncio, contextvars, functools, re, threading, time, weakref
+import deadline, http_client
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from urllib.parse import quote, urlsplit
 from datetime import date, timedelta
-from dateparser import parse as dparse
-from trafilatura.settings import use_config
+from article_cache import ArticleCache, get_cache as get_article_cache
+from profiling import stage
+from ranking import OVERSAMPLE, top_k
+from dedupe import collapse_duplicates
 
-# Configure Trafilatura
-CFG = use_config()
-CFG.set("DEFAULT", "USER_AGENT", "ai-misinfo/0.3 (contact: you@example.com)")
+# feedparser, trafilatura and dateparser take most of a second to import, and Wikipedia-only
+# or quick-check processes never touch them, so they load on first use (see _trafilatura)
+
+# Fetch stage: bounded pool, per-host politeness, per-URL timeout
+FETCH_WORKERS = 8        # total articles downloaded at once
+PER_HOST_LIMIT = 2       # concurrent requests to any one host
+PER_HOST_DELAY = 0.2     # min seconds between request starts to one host
+FETCH_TIMEOUT = 10       # seconds allowed per article (download + extract)
+RECENT_DAYS = 5          # older feed entries are dropped before anything is downloaded
+REDIRECTORS = frozenset({"news.google.com"})   # feed links that bounce to the publisher
+HOST_MEMORY = 256        # hosts remembered for politeness; the least recently used idle ones are dropped
+
+_host_lock = threading.Lock()
+_hosts = OrderedDict()   # host -> _Host, least recently used first
+
+class _Host:
+    __slots__ = ("slots", "last", "users")
+
+    def __init__(self, slots):
+        self.slots = slots   # threading or asyncio Semaphore(PER_HOST_LIMIT)
+        self.last = 0.0      # monotonic time of the last request start
+        self.users = 0       # fetches holding or waiting for a slot
+
+    def delay(self):
+        """Seconds until this request may start (PER_HOST_DELAY after the previous one)."""
+        now = time.monotonic()
+        start = self.last = max(now, self.last + PER_HOST_DELAY)
+        return start - now
 
 def _clean(txt, n=420):
     if not txt:
@@ -15,50 +48,230 @@ def _clean(txt, n=420):
     txt = re.sub(r"\s+", " ", txt).strip()
     return txt[:n]
 
-def _fetch_article(url):
+def _claim_host(hosts, host, semaphore):
+    """hosts[host] (created with a semaphore(PER_HOST_LIMIT)), marked in use and most recently used.
+
+    Past HOST_MEMORY entries the least recently used idle hosts are forgotten;
+    hosts in use, or whose delay hasn't passed, are kept. The caller serializes access.
+    """
+    h = hosts.get(host)
+    if h is None:
+        now = time.monotonic()
+        for old, o in list(hosts.items()):
+            if len(hosts) < HOST_MEMORY:
+                break
+            if not o.users and now - o.last >= PER_HOST_DELAY:
+                del hosts[old]
+        h = hosts[host] = _Host(semaphore(PER_HOST_LIMIT))
+    hosts.move_to_end(host)
+    h.users += 1
+    return h
+
+@contextmanager
+def _host_turn(host):
+    """Hold one of host's PER_HOST_LIMIT slots, starting PER_HOST_DELAY after its previous request."""
+    with _host_lock:
+        h = _claim_host(_hosts, host, threading.Semaphore)
+    try:
+        with h.slots:
+            with _host_lock:
+                wait_s = h.delay()
+            if wait_s > 0:
+                time.sleep(wait_s)
+            yield
+    finally:
+        with _host_lock:
+            h.users -= 1
+
+@functools.lru_cache(maxsize=None)
+def _trafilatura():
+    """(trafilatura module, its config), imported and configured once."""
+    import trafilatura
+    from trafilatura.settings import use_config
+    cfg = use_config()
+    cfg.set("DEFAULT", "USER_AGENT", http_client.USER_AGENT)
+    return trafilatura, cfg
+
+def _parse_feed(content):
+    import feedparser
+    return feedparser.parse(content)
+
+# ── Article cache ────────────────────────────────────────────────────────────
+# The same URLs recur across related headlines: fresh rows skip the network, stale
+# ones are revalidated with a conditional GET and a 304 skips re-extraction.
+def _lookup(url):
+    try:
+        return get_article_cache().get(url)
+    except Exception as e:   # a broken cache file must not stop research
+        print(f"Article cache error: {e}")
+        return None
+
+def _store(url, text, r):
     try:
-        html = trafilatura.fetch_url(url, no_ssl=True, config=CFG)
-        if not html:
+        get_article_cache().put(url, text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    except Exception as e:
+        print(f"Article cache error: {e}")
+
+def _extract(html):
+    trafilatura, cfg = _trafilatura()
+    return _clean(trafilatura.extract(html, include_links=False, include_tables=False, config=cfg), 800)
+
+@stage("research.fetch_article")
+def _fetch_article(url, cached=None):
+    try:
+        r = http_client.get(url, headers=ArticleCache.conditional_headers(cached), timeout=FETCH_TIMEOUT,
+                            verify=False)
+        if r.status_code == 304 and cached:
+            get_article_cache().revalidated(url)
+            return cached.text
+        if r.status_code != 200 or not r.text:
             return None
-        text = trafilatura.extract(html, include_links=False, include_tables=False, config=CFG)
-        return _clean(text, 800)
+        text = _extract(r.text)
+        if text:
+            _store(url, text, r)
+        return text
     except Exception:
         return None
 
+def _politeness_host(url, publisher=None):
+    """Host a fetch of url is spaced and limited against.
+
+    Every Google News link is on news.google.com and redirects to the article's
+    publisher, so those count against the publisher the feed names (or, when it
+    names none, against nothing shared) rather than all queueing on one host.
+    """
+    host = urlsplit(url).netloc.lower()
+    if host not in REDIRECTORS:
+        return host
+    return urlsplit(publisher).netloc.lower() if publisher else url
+
+def _entry_host(entry):
+    return _politeness_host(entry.get("link"), (entry.get("source") or {}).get("href"))
+
+def _polite_fetch(url, host):
+    cached = _lookup(url)
+    if get_article_cache().is_fresh(cached):
+        return cached.text   # no request, so no politeness wait either
+    with _host_turn(host):
+        return _fetch_article(url, cached)
+
+def _fetch_all(urls, hosts=None, timeout=FETCH_TIMEOUT):
+    """Fetch articles concurrently; returns texts aligned with `urls` (None on failure/timeout).
+
+    hosts (aligned with urls) are what politeness is keyed on; by default each URL's own.
+    """
+    if not urls:
+        return []
+    hosts = hosts or [_politeness_host(u) for u in urls]
+    pool = ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(urls)))
+    futures = [pool.submit(contextvars.copy_context().run, _polite_fetch, u, h) for u, h in zip(urls, hosts)]
+    # URLs queue behind others on the same host and behind the pool's FETCH_WORKERS,
+    # so the batch gets one timeout per "wave" of whichever queue is longer
+    busiest = max(Counter(hosts).values())
+    waves = max(-(-busiest // PER_HOST_LIMIT), -(-len(urls) // FETCH_WORKERS))
+    try:
+        wait(futures, timeout=deadline.cap(waves * (timeout + PER_HOST_DELAY)))
+    except deadline.DeadlineExceeded:
+        pass
+    texts = [f.result() if f.done() and not f.cancelled() else None for f in futures]
+    pool.shutdown(wait=False, cancel_futures=True)
+    if None in texts and deadline.expired():
+        deadline.note("article downloads cut short (feed summaries used)")
+    return texts
+
 def _norm_date(s):
+    from dateparser import parse as dparse   # only for dates email.utils can't read
     dt = dparse(s, settings={"RETURN_AS_TIMEZONE_AWARE": False})
     return dt.date().isoformat() if dt else None
 
-def google_news_rss(query, lang="en", country="IN"):
+def _entry_date(entry):
+    """ISO publication date: feedparser's parsed struct, else RFC 822 via email.utils, else dateparser."""
+    for key in ("published_parsed", "updated_parsed"):
+        st = entry.get(key)
+        if st:
+            return date(*st[:3]).isoformat()
+    raw = entry.get("published") or entry.get("updated") or ""
+    if not raw:
+        return None
+    try:
+        return parsedate_to_datetime(raw).date().isoformat()
+    except (TypeError, ValueError, IndexError):
+        return _norm_date(raw)
+
+def _feed_url(query, lang="en", country="IN"):
     q = quote(query)
-    url = f"https://news.google.com/rss/search?q={q}&hl={lang}-{country}&gl={country}&ceid={country}:{lang}"
-    return feedparser.parse(url)
+    return f"https://news.google.com/rss/search?q={q}&hl={lang}-{country}&gl={country}&ceid={country}:{lang}"
+
+def google_news_rss(query, lang="en", country="IN"):
+    # fetch over the shared session; feedparser only parses
+    r = http_client.get(_feed_url(query, lang, country), timeout=FETCH_TIMEOUT)
+    r.raise_for_status()
+    return _parse_feed(r.content)
 
-def build_news_evidence(headline: str, k: int = 6,
-                        out_json="news_evidence.json", out_txt="news_evidence.txt"):
-    feed = google_news_rss(headline)
-    items = []
+# ── Candidate stream ─────────────────────────────────────────────────────────
+# Feed entries flow lazily through cheap filters, so only entries that can still
+# make the cut are ever downloaded: usable -> recent -> not a repeat -> fetch.
+def _usable_entries(feed):
     for entry in feed.entries:
         link = entry.get("link")
         title = (entry.get("title") or "").strip()
-        if not link or not title:
+        if link and title:
+            yield entry
+
+def _recent(entries, days=RECENT_DAYS):
+    """(entry, iso date) for entries from the last `days` days; undated entries pass."""
+    cutoff = (date.today() - timedelta(days=days)).isoformat()
+    for entry in entries:
+        d = _entry_date(entry)
+        if not d or d >= cutoff:
+            yield entry, d
+
+def _title_key(title):
+    # Google News titles end in " - Outlet"; the same story from two outlets shares the rest
+    title = re.sub(r"\s+-\s+[^-]+$", "", title or "")
+    return " ".join(re.findall(r"\w+", title.lower()))
+
+def _unique(candidates):
+    seen_links, seen_titles = set(), set()
+    for entry, d in candidates:
+        link, key = entry.get("link"), _title_key(entry.get("title"))
+        if link in seen_links or (key and key in seen_titles):
             continue
+        seen_links.add(link)
+        seen_titles.add(key)
+        yield entry, d
+
+def _candidates(feed):
+    return _unique(_recent(_usable_entries(feed)))
+
+def _take(candidates, n):
+    return list(islice(candidates, max(0, n)))
+
+def _records(batch, texts):
+    out = []
+    for (entry, d), fetched in zip(batch, texts):
         summary = _clean(entry.get("summary") or entry.get("description") or "")
-        text = _fetch_article(link) or summary
-        pub = entry.get("published") or entry.get("updated") or ""
-        norm_date = _norm_date(pub)
+        text = fetched or summary
         if not text:
             continue
-        rec = {"title": title, "text": text, "source": link, "date": norm_date}
-        items.append(rec)
-        if len(items) >= k * 2:  # fetch a few extra to filter later
-            break
-        time.sleep(0.2)
+        out.append({"title": entry.get("title").strip(), "text": text,
+                    "source": entry.get("link"), "date": d})
+    return out
 
-    # Keep only recent articles (last 5 days)
-    cutoff = date.today() - timedelta(days=5)
-    items = [it for it in items if not it["date"] or it["date"] >= cutoff.isoformat()]
-    items = items[:k]
+def _summary_fallback(candidates, items, want):
+    # out of time: the candidates we never got to still have feed summaries
+    if len(items) >= want or not deadline.expired():
+        return []
+    batch = _take(candidates, want - len(items))
+    if batch:
+        deadline.note("article downloads cut short (feed summaries used)")
+    return _records(batch, [None] * len(batch))
+
+def _finalize(headline, items, k):
+    # Recency was settled before fetching; syndicated copies of one wire story
+    # (different titles, same body) would otherwise eat several of the k slots
+    items, _ = collapse_duplicates(items)
+    items = top_k(headline, items, k)
 
     # Assign R1..Rn
     for i, it in enumerate(items, 1):
@@ -70,16 +283,108 @@ def build_news_evidence(headline: str, k: int = 6,
         items = [{"id": "R1", "title": "No recent news found",
                   "text": "No relevant articles retrieved.",
                   "source": "none", "date": None}]
+    return items
+
+def format_evidence(items):
+    """Evidence as "ID|title (date): text (src: url)" lines."""
+    return "\n".join(f"{it['id']}|{it['title']} ({it['date']}): {it['text']} (src: {it['source']})" for it in items)
+
+@stage("research.news")
+def build_news_evidence(headline: str, k: int = 6):
+    candidates = _candidates(google_news_rss(headline))
+    items, want = [], k * OVERSAMPLE   # ranking keeps the best k of these
+    # download only as many candidates as are still needed; failures pull in the next ones
+    while len(items) < want and not deadline.expired():
+        batch = _take(candidates, want - len(items))
+        if not batch:
+            break
+        items += _records(batch, _fetch_all([e.get("link") for e, _ in batch],
+                                            [_entry_host(e) for e, _ in batch]))
+    items += _summary_fallback(candidates, items, want)
+    return _finalize(headline, items, k)
+
+# ── Async variant ────────────────────────────────────────────────────────────
+# asyncio primitives belong to one event loop, so per-host state is kept per loop
+# (and, being touched only from that loop, needs no lock).
+_async_hosts = weakref.WeakKeyDictionary()   # loop -> OrderedDict host -> _Host, capped like _hosts
+# without a deadline this still bounds one URL: its politeness wait, download and extraction
+ASYNC_FETCH_TIMEOUT = FETCH_TIMEOUT + PER_HOST_LIMIT * PER_HOST_DELAY
+
+async def _fetch_article_async(url, cached):
+    try:
+        r = await http_client.get_async(url, headers=ArticleCache.conditional_headers(cached),
+                                        timeout=FETCH_TIMEOUT, verify=False)
+        if r.status_code == 304 and cached:
+            await asyncio.to_thread(get_article_cache().revalidated, url)
+            return cached.text
+        if r.status_code != 200 or not r.text:
+            return None
+        # extraction is CPU-bound; keep it off the event loop
+        text = await asyncio.to_thread(_extract, r.text)
+        if text:
+            await asyncio.to_thread(_store, url, text, r)
+        return text
+    except Exception:
+        return None
 
-    # Save evidence
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-    with open(out_txt, "w", encoding="utf-8") as f:
-        for it in items:
-            f.write(f"{it['id']}|{it['title']} ({it['date']}): {it['text']} (src: {it['source']})\n")
+async def _host_turn_async(h, url, cached):
+    wait_s = h.delay()
+    if wait_s > 0:
+        await asyncio.sleep(wait_s)
+    return await _fetch_article_async(url, cached)
 
-    return items, out_json, out_txt
+async def _polite_fetch_async(url, host):
+    cached = await asyncio.to_thread(_lookup, url)
+    if get_article_cache().is_fresh(cached):
+        return cached.text
+    hosts = _async_hosts.setdefault(asyncio.get_running_loop(), OrderedDict())
+    h = _claim_host(hosts, host, asyncio.Semaphore)
+    try:
+        async with h.slots:
+            return await asyncio.wait_for(_host_turn_async(h, url, cached), ASYNC_FETCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        h.users -= 1
+
+async def _fetch_all_async(urls, hosts, limit):
+    async def one(url, host):
+        async with limit:
+            return await _polite_fetch_async(url, host)
+    tasks = [asyncio.ensure_future(one(u, h)) for u, h in zip(urls, hosts)]
+    if not tasks:
+        return []
+    try:
+        await asyncio.wait(tasks, timeout=deadline.cap(None))
+    except deadline.DeadlineExceeded:
+        pass
+    texts = []
+    for t in tasks:
+        if t.done():
+            texts.append(t.result())
+        else:
+            t.cancel()
+            texts.append(None)
+    if None in texts and deadline.expired():
+        deadline.note("article downloads cut short (feed summaries used)")
+    return texts
+
+async def build_news_evidence_async(headline: str, k: int = 6):
+    """Async build_news_evidence: feed and articles over httpx, extraction in worker threads."""
+    limit = asyncio.Semaphore(FETCH_WORKERS)
+    r = await http_client.get_async(_feed_url(headline), timeout=FETCH_TIMEOUT)
+    r.raise_for_status()
+    candidates = _candidates(_parse_feed(r.content))
+    items, want = [], k * OVERSAMPLE
+    while len(items) < want and not deadline.expired():
+        batch = _take(candidates, want - len(items))
+        if not batch:
+            break
+        items += _records(batch, await _fetch_all_async([e.get("link") for e, _ in batch],
+                                                        [_entry_host(e) for e, _ in batch], limit))
+    items += _summary_fallback(candidates, items, want)
+    return _finalize(headline, items, k)
 
 if __name__ == "__main__":
-    items, j, t = build_news_evidence("Example headline")
-    print(f"Found {len(items)} items -> {j}, {t}")
+    import sys
+    print(format_evidence(build_news_evidence(sys.argv[1] if len(sys.argv) > 1 else "Example headline")))
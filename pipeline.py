@@ -0,0 +1,308 @@
+# pipeline.py - headless analysis pipeline (research + debate + control), no UI imports
+import asyncio, time
+from datetime import datetime, timezone
+
+import agents2, artifacts, deadline
+from agents2 import (control_probe, control_verdict, control_verdict_async, run_misinfo_stream,
+                     run_with_control, run_with_control_async)
+from dedupe import collapse_duplicates
+from evidence_cache import get_cache as get_evidence_cache
+import verdict_store
+
+# UI labels and short names both map to the evidence cache's source keys
+SOURCE_ALIASES = {"recent news": "news", "news": "news", "wikipedia": "wiki", "wiki": "wiki"}
+
+def source_key(source_type):
+    """'Recent News'/'news' -> 'news', 'Wikipedia'/'wiki' -> 'wiki'; None/'none' -> None."""
+    if not source_type or str(source_type).lower() == "none":
+        return None
+    try:
+        return SOURCE_ALIASES[str(source_type).strip().lower()]
+    except KeyError:
+        raise ValueError(f"unknown research source {source_type!r}") from None
+
+def parse_evidence(evidence_text: str):
+    """Parse evidence text into structured format"""
+    items = []
+    if not evidence_text:
+        return items
+
+    for line in evidence_text.strip().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if "|" in line:
+            eid, txt = line.split("|", 1)
+            items.append({"id": eid.strip(), "text": txt.strip()})
+        else:
+            items.append({"id": f"U{len(items)+1}", "text": line})
+    return items
+
+def _builder(src, asynchronous=False):
+    # research backends are imported on first use: the news stack alone takes most of a second
+    if src == "news":
+        import news_researcher as backend
+        return backend.build_news_evidence_async if asynchronous else backend.build_news_evidence
+    import researcher as backend
+    return backend.build_evidence_async if asynchronous else backend.build_evidence
+
+def research(headline, k=5, source="news"):
+    """Auto-research evidence for a headline through the shared evidence cache."""
+    src, k = source_key(source), int(k)
+    if src is None:
+        return []
+    build = _builder(src)
+
+    def _build():
+        items = build(headline, k=k)
+        artifacts.save_evidence(src, headline, items)   # no-op unless EVIDENCE_ARTIFACT_DIR is set
+        return items
+    return get_evidence_cache().fetch(src, headline, k, _build)
+
+async def research_async(headline, k=5, source="news"):
+    src, k = source_key(source), int(k)
+    if src is None:
+        return []
+    build = _builder(src, asynchronous=True)
+
+    async def _build():
+        items = await build(headline, k=k)
+        artifacts.save_evidence(src, headline, items)
+        return items
+    return await get_evidence_cache().fetch_async(src, headline, k, _build)
+
+def merge_evidence(manual, researched):
+    """Manual evidence first, then research, with near-duplicates collapsed before IDs are final.
+
+    Manual items keep their IDs; research items are renumbered R1…Rn in order,
+    skipping any ID the user already used.
+    """
+    items, _ = collapse_duplicates(list(manual) + list(researched))   # counted by duplicates_collapsed
+    taken = {it.get("id") for it in items if isinstance(it, dict) and "source" not in it}
+    n = 0
+    for it in items:
+        if isinstance(it, dict) and "source" in it:
+            n += 1
+            while f"R{n}" in taken:
+                n += 1
+            it["id"] = f"R{n}"
+    return items
+
+def duplicates_collapsed(evidence):
+    """Near-duplicates folded into the kept items, across research and merge stages."""
+    return sum(it.get("duplicates", 0) for it in evidence if isinstance(it, dict))
+
+def gather_evidence(headline, evidence=None, auto_research=True, k=5, source="news"):
+    """Manual evidence (list or 'ID|text' lines) plus auto-research. Research errors are logged and skipped."""
+    manual = parse_evidence(evidence) if isinstance(evidence, str) else list(evidence or [])
+    researched = []
+    if auto_research:
+        try:
+            researched = research(headline, k=k, source=source)
+        except Exception as e:
+            print(f"Research error: {e}")
+            if deadline.cut_off(e):
+                deadline.note("research timed out")
+    return merge_evidence(manual, researched)
+
+async def gather_evidence_async(headline, evidence=None, auto_research=True, k=5, source="news"):
+    manual = parse_evidence(evidence) if isinstance(evidence, str) else list(evidence or [])
+    researched = []
+    if auto_research:
+        try:
+            researched = await research_async(headline, k=k, source=source)
+        except Exception as e:
+            print(f"Research error: {e}")
+            if deadline.cut_off(e):
+                deadline.note("research timed out")
+    return merge_evidence(manual, researched)
+
+def build_result(headline, evidence, transcript, verdict, control, timing):
+    return {
+        "headline": headline,
+        "label": verdict.get("label", "unverified"),
+        "confidence": verdict.get("confidence", 0),
+        "verdict": verdict,
+        "control": control,
+        "transcript": transcript,
+        "evidence": evidence,
+        "duplicates_collapsed": duplicates_collapsed(evidence),
+        "degraded": bool(verdict.get("degraded")),
+        "timing": timing,
+        "analyzed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+# ── Verdict reuse ─────────────────────────────────────────────────────────────
+def _reuse_scope(evidence, auto_research, source, rounds=2, k=5, adaptive=None):
+    """Store scope for this request, or None when it must run fresh (manual evidence given).
+
+    Requests asking for more rounds, more sources or a non-adaptive debate get their
+    own scope, so they never reuse a verdict reached with less.
+    """
+    if not verdict_store.ENABLED:
+        return None
+    manual = evidence.strip() if isinstance(evidence, str) else evidence
+    if manual:
+        return None
+    src = (source_key(source) if auto_research else None) or "none"
+    if adaptive is None:
+        adaptive = agents2.ADAPTIVE_DEBATE
+    return "|".join([src, f"rounds={int(rounds)}", *([f"k={int(k)}"] if src != "none" else []),
+                     "adaptive" if adaptive else "full"])
+
+def recall_verdict(headline, evidence=None, auto_research=True, source="news", rounds=2, k=5, adaptive=None):
+    """Recent result for a near-identical headline (with a 'cached' provenance block), or None."""
+    scope = _reuse_scope(evidence, auto_research, source, rounds, k, adaptive)
+    if scope is None:
+        return None
+    try:
+        hit = verdict_store.get_store().lookup(headline, scope)
+    except Exception as e:
+        print(f"Verdict store error: {e}")
+        return None
+    if hit:
+        c = hit["cached"]
+        print(f"Reusing verdict for {c['matched_headline']!r} ({c['age_s']:.0f}s old)")
+        hit["headline"] = headline
+    return hit
+
+def remember_verdict(result, evidence=None, auto_research=True, source="news", rounds=2, k=5, adaptive=None):
+    scope = _reuse_scope(evidence, auto_research, source, rounds, k, adaptive)
+    if scope is None or result.get("degraded"):
+        return
+    # a verdict reached without real sources (research failed / found nothing) isn't worth reusing
+    researched = not scope.startswith("none|")
+    if researched and not any(isinstance(it, dict) and it.get("source") not in (None, "none")
+                              for it in result.get("evidence", [])):
+        return
+    try:
+        verdict_store.get_store().remember(result["headline"], result, scope)
+    except Exception as e:
+        print(f"Verdict store error: {e}")
+
+# ── Analysis ──────────────────────────────────────────────────────────────────
+def analyze(client, headline, evidence=None, rounds=2, auto_research=True, k=5, source="news",
+            token_budget=None, reuse=True, deadline_s=None, adaptive=None):
+    """Full analysis as plain data: research, then debate and control side by side.
+
+    With reuse, a fresh stored verdict for a near-identical headline is returned
+    instead (see verdict_store); its 'cached' key says which headline and how old.
+    deadline_s bounds the whole run (None: deadline.ANALYSIS_DEADLINE, 0: unbounded);
+    whatever is cut short leaves 'degraded' set on the result and its verdicts.
+    adaptive=False forces every debate round (default: agents2.ADAPTIVE_DEBATE).
+    """
+    if reuse:
+        hit = recall_verdict(headline, evidence, auto_research, source, rounds, k, adaptive)
+        if hit:
+            return hit
+    t0 = time.perf_counter()
+    dl = deadline.start(deadline_s)
+    with deadline.use(dl):
+        items = gather_evidence(headline, evidence, auto_research, k, source)
+        research_s = round(time.perf_counter() - t0, 3)
+        transcript, verdict, control, timing = run_with_control(client, headline, items, rounds=rounds,
+                                                              token_budget=token_budget, deadline=dl,
+                                                              adaptive=adaptive)
+    timing = dict(timing, research_s=research_s, total_s=round(time.perf_counter() - t0, 3))
+    result = build_result(headline, items, transcript, verdict, control, timing)
+    if reuse:
+        remember_verdict(result, evidence, auto_research, source, rounds, k, adaptive)
+    return result
+
+def quick_check(client, headline, evidence=None, auto_research=False, k=5, source="news", deadline_s=None):
+    """Control verdict only (single model call, no debate), as plain data."""
+    t0 = time.perf_counter()
+    dl = deadline.start(deadline_s)
+    with deadline.use(dl):
+        items = gather_evidence(headline, evidence, auto_research, k, source)
+        control = control_verdict(client, headline, items, deadline=dl)
+    if dl is not None:
+        dl.mark(control)   # research cut short counts too
+    return {
+        "headline": headline,
+        "label": control.get("label", "unverified"),
+        "confidence": control.get("confidence", 0),
+        "control": control,
+        "evidence": items,
+        "degraded": bool(control.get("degraded")),
+        "timing": {"total_s": round(time.perf_counter() - t0, 3)},
+        "analyzed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+async def analyze_async(client, headline, evidence=None, rounds=2, auto_research=True, k=5, source="news",
+                        token_budget=None, reuse=True, deadline_s=None, adaptive=None):
+    if reuse:
+        hit = await asyncio.to_thread(recall_verdict, headline, evidence, auto_research, source,
+                                      rounds, k, adaptive)
+        if hit:
+            return hit
+    t0 = time.perf_counter()
+    dl = deadline.start(deadline_s)
+    with deadline.use(dl):
+        items = await gather_evidence_async(headline, evidence, auto_research, k, source)
+        research_s = round(time.perf_counter() - t0, 3)
+        transcript, verdict, control, timing = await run_with_control_async(
+            client, headline, items, rounds=rounds, token_budget=token_budget, deadline=dl, adaptive=adaptive)
+    timing = dict(timing, research_s=research_s, total_s=round(time.perf_counter() - t0, 3))
+    result = build_result(headline, items, transcript, verdict, control, timing)
+    if reuse:
+        await asyncio.to_thread(remember_verdict, result, evidence, auto_research, source, rounds, k, adaptive)
+    return result
+
+async def analyze_stream(client, headline, evidence=None, rounds=2, auto_research=True, k=5, source="news",
+                         token_budget=None, reuse=True, deadline_s=None, adaptive=None):
+    """analyze_async as it happens. Async-yields events:
+
+    {"type": "research"}                      no stored verdict to reuse; gathering evidence
+    {"type": "evidence", "evidence"}          merged evidence the debate will use
+    {"type": "chunk" | "turn", ...}           debate progress (see agents2.run_misinfo_stream)
+    {"type": "control", "control"}            control verdict, as soon as it lands
+    {"type": "result", "result"}              the analyze() dict (or a reused one), always last
+    """
+    if reuse:
+        hit = await asyncio.to_thread(recall_verdict, headline, evidence, auto_research, source,
+                                      rounds, k, adaptive)
+        if hit:
+            yield {"type": "result", "result": hit}
+            return
+    yield {"type": "research"}
+    t0 = time.perf_counter()
+    # passed explicitly below: a context var set here wouldn't survive this generator's yields
+    dl = deadline.start(deadline_s)
+    with deadline.use(dl):
+        items = await gather_evidence_async(headline, evidence, auto_research, k, source)
+    research_s = round(time.perf_counter() - t0, 3)
+    yield {"type": "evidence", "evidence": items}
+
+    # control runs alongside the streamed debate
+    t1 = time.perf_counter()
+    async def _control():
+        result = await control_verdict_async(client, headline, items, deadline=dl)
+        return result, round(time.perf_counter() - t1, 3)
+    control_task = asyncio.create_task(_control())
+    transcript, verdict, control_sent = "", None, False
+    try:
+        async for event in run_misinfo_stream(client, headline, items, rounds=rounds, token_budget=token_budget,
+                                              deadline=dl, adaptive=adaptive, control=control_probe(control_task)):
+            if control_task.done() and not control_sent:
+                control_sent = True
+                yield {"type": "control", "control": control_task.result()[0]}
+            transcript = event["transcript"]
+            if event["type"] == "verdict":
+                verdict = event["verdict"]
+                break
+            yield event
+        debate_s = round(time.perf_counter() - t1, 3)
+        control, control_s = await control_task
+    finally:
+        if not control_task.done():
+            control_task.cancel()
+    if dl is not None:
+        dl.mark(verdict)
+        dl.mark(control)
+    timing = {"debate_s": debate_s, "control_s": control_s, "research_s": research_s,
+              "total_s": round(time.perf_counter() - t0, 3)}
+    result = build_result(headline, items, transcript, verdict, control, timing)
+    if reuse:
+        await asyncio.to_thread(remember_verdict, result, evidence, auto_research, source, rounds, k, adaptive)
+    yield {"type": "result", "result": result}
@@ -0,0 +1,100 @@
+# profiling.py - lightweight stage timing (spans) with percentile reports
+import contextvars, functools, math, threading, time
+from contextlib import contextmanager
+
+_trace = contextvars.ContextVar("trace", default=None)   # per-analysis span list
+
+def percentile(sorted_vals, q):
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_vals:
+        return 0.0
+    idx = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[idx]
+
+class Profiler:
+    """Collects span durations per stage name across runs."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def samples(self):
+        with self._lock:
+            return {k: list(v) for k, v in self._samples.items()}
+
+    def report(self):
+        """{stage: {count, total_s, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}"""
+        out = {}
+        for name, vals in sorted(self.samples().items()):
+            vals.sort()
+            out[name] = {
+                "count": len(vals),
+                "total_s": round(sum(vals), 4),
+                "mean_ms": round(sum(vals) / len(vals) * 1000, 3),
+                "p50_ms": round(percentile(vals, 50) * 1000, 3),
+                "p95_ms": round(percentile(vals, 95) * 1000, 3),
+                "p99_ms": round(percentile(vals, 99) * 1000, 3),
+                "max_ms": round(vals[-1] * 1000, 3),
+            }
+        return out
+
+    def format_report(self):
+        rows = self.report()
+        width = max([len(n) for n in rows] + [5])
+        lines = [f"{'stage'.ljust(width)}  {'n':>5}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'total s':>8}"]
+        for name, r in rows.items():
+            lines.append(f"{name.ljust(width)}  {r['count']:>5}  {r['p50_ms']:>9.2f}  "
+                         f"{r['p95_ms']:>9.2f}  {r['p99_ms']:>9.2f}  {r['total_s']:>8.3f}")
+        return "\n".join(lines)
+
+PROFILER = Profiler()
+
+@contextmanager
+def span(name):
+    """Time a stage. Free when profiling is off and no trace is active."""
+    trace = _trace.get()
+    if trace is None and not PROFILER.enabled:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        if PROFILER.enabled:
+            PROFILER.record(name, dt)
+        if trace is not None:
+            trace.append((name, round(dt, 4)))
+
+@contextmanager
+def trace():
+    """Collect the spans of one analysis: `with trace() as spans: ...` -> [(stage, seconds), ...].
+
+    Work handed to thread pools only lands here if submitted via
+    contextvars.copy_context().run (see agents2.run_with_control).
+    """
+    spans = []
+    token = _trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _trace.reset(token)
+
+def stage(name):
+    """Decorator form of span() for whole functions."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
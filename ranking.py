@@ -0,0 +1,67 @@
+# ranking.py - local BM25 relevance ranking of evidence against a headline
+import os, re
+import numpy as np
+
+EVIDENCE_CHAR_BUDGET = int(os.getenv("EVIDENCE_CHAR_BUDGET", 3000))  # evidence text per prompt
+MAX_PROMPT_EVIDENCE = 8
+OVERSAMPLE = 2   # research builders score this many times k candidates, keep the top k
+
+_STOP = frozenset("""
+a an the and or but of to in on at for from by with as is are was were be been being it its this that
+these those has have had do does did will would can could should may might not no than then so such
+about into over after before new says said just""".split())
+_WORD = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    return [w for w in _WORD.findall((text or "").lower()) if w not in _STOP and len(w) > 1]
+
+def item_text(item):
+    if isinstance(item, dict):
+        return f"{item.get('title', '')} {item.get('text') or item.get('summary') or ''}"
+    return str(item)
+
+def bm25_scores(query, docs, k1=1.5, b=0.75):
+    """BM25 score of every doc for the query, computed as one (docs x query-terms) matrix."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not docs:
+        return np.zeros(0)
+    if not terms:
+        return np.zeros(len(docs))
+    col = {t: j for j, t in enumerate(terms)}
+    tf = np.zeros((len(docs), len(terms)))
+    lengths = np.zeros(len(docs))
+    for i, doc in enumerate(docs):
+        toks = tokenize(doc)
+        lengths[i] = len(toks)
+        for t in toks:
+            j = col.get(t)
+            if j is not None:
+                tf[i, j] += 1
+    n = len(docs)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avgdl = lengths.mean() or 1.0
+    norm = k1 * (1 - b + b * lengths / avgdl)
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+def rank(query, items):
+    """Indices of items, most relevant first (stable for ties, so feed/search order breaks them)."""
+    scores = bm25_scores(query, [item_text(it) for it in items])
+    return list(np.argsort(-scores, kind="stable"))
+
+def top_k(query, items, k):
+    return [items[i] for i in rank(query, items)[:k]]
+
+def select_evidence(headline, evidence, char_budget=None, max_items=MAX_PROMPT_EVIDENCE):
+    """Most relevant evidence that fits the character budget (at least one item if any exist)."""
+    if not evidence:
+        return []
+    budget = EVIDENCE_CHAR_BUDGET if char_budget is None else char_budget
+    out, used = [], 0
+    for i in rank(headline, evidence):
+        size = len(item_text(evidence[i]))
+        if out and (len(out) >= max_items or used + size > budget):
+            continue
+        out.append(evidence[i])
+        used += size
+    return out
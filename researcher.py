@@ -1,13 +1,19 @@
 # researcher.py
-import json, re, requests
+import asyncio, contextvars, re
+import deadline, http_client
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import quote
+from profiling import stage
+from ranking import OVERSAMPLE, top_k
+from dedupe import collapse_duplicates
 
 HEADERS = {
     "User-Agent": "ai-judgement/0.2 (contact: you@example.com)",
     "Accept": "application/json",
 }
 SEARCH_API  = "https://en.wikipedia.org/w/api.php?action=query&list=search&srsearch={q}&srlimit={k}&format=json&utf8=1"
-SUMMARY_API = "https://en.wikipedia.org/api/rest_v1/page/summary/{title}"
+EXTRACTS_API = "https://en.wikipedia.org/w/api.php"
+EXTRACTS_BATCH = 20  # MediaWiki caps exintro extracts at 20 titles per query
 
 QUERIES = [
     "{topic}",
@@ -22,57 +28,146 @@ def _clean(txt: str, max_len=320):
     txt = re.sub(r"\s+", " ", txt).strip()
     return txt[:max_len]
 
-def _wiki_once(query: str, k: int):
-    r = requests.get(SEARCH_API.format(q=quote(query), k=k), headers=HEADERS, timeout=20)
+def _wiki_search(query: str, k: int):
+    r = http_client.get(SEARCH_API.format(q=quote(query), k=k), headers=HEADERS)
     r.raise_for_status()
     hits = r.json().get("query", {}).get("search", [])
+    return [h["title"] for h in hits if h.get("title")]
+
+def _extracts_params(titles):
+    return {
+        "action": "query", "prop": "extracts", "exintro": 1, "explaintext": 1,
+        "exlimit": len(titles), "redirects": 1, "format": "json", "utf8": 1,
+        "titles": "|".join(titles),
+    }
+
+def _map_extracts(titles, payload):
+    q = payload.get("query", {})
+    # map requested titles through normalization/redirects to the page we got back
+    alias = {}
+    for step in q.get("normalized", []) + q.get("redirects", []):
+        alias[step["from"]] = step["to"]
+    pages = {p.get("title"): p.get("extract") or "" for p in q.get("pages", {}).values()}
+    out = {}
+    for t in titles:
+        final = t
+        while final in alias and alias[final] != final:
+            final = alias[final]
+        out[t] = pages.get(final, "")
+    return out
+
+def _wiki_extracts(titles):
+    """One multi-title extracts query; returns {requested title: plain-text intro}."""
+    r = http_client.get(EXTRACTS_API, params=_extracts_params(titles), headers=HEADERS)
+    r.raise_for_status()
+    return _map_extracts(titles, r.json())
+
+def _dedupe_titles(results):
+    # de-dup by title (query order) before any summary is fetched
+    return list(dict.fromkeys(t for hits in results for t in hits))
+
+def _next_batch(titles, pos, have, want):
+    # only ask for as many titles as we still need; empty extracts pull in the next ones
+    return titles[pos:pos + min(want - have, EXTRACTS_BATCH)]
+
+def _items_from(batch, extracts):
     out = []
-    for h in hits:
-        title = h.get("title")
-        if not title:
-            continue
-        s = requests.get(SUMMARY_API.format(title=quote(title.replace(" ", "_"))), headers=HEADERS, timeout=20)
-        if s.status_code != 200:
-            continue
-        sj = s.json()
-        summary = sj.get("extract") or sj.get("description") or ""
-        summary = _clean(summary)
+    for title in batch:
+        summary = _clean(extracts.get(title, ""))
         if not summary:
             continue
         url = f"https://en.wikipedia.org/wiki/{quote(title.replace(' ', '_'))}"
         out.append({"title": title, "text": summary, "source": url})
     return out
 
-def wiki_research(topic: str, k: int = 6):
-    items = []
-    for q in QUERIES:
-        items += _wiki_once(q.format(topic=topic), k=3)
-    # de-dup by title, cap to k
-    seen, out = set(), []
-    for it in items:
-        if it["title"] in seen:
-            continue
-        seen.add(it["title"])
-        out.append(it)
-        if len(out) == k:
-            break
-    # assign IDs R1…Rn
+def _assign_ids(topic, out, k):
+    # keep the k most relevant of the oversampled candidates, then assign IDs R1…Rn
+    out, _ = collapse_duplicates(out)
+    out = top_k(topic, out, k)
     for i, it in enumerate(out, 1):
         it["id"] = f"R{i}"
         it["text"] = it["text"][:320]
     return out
 
-def build_evidence(topic: str, k: int = 6, out_json="research_evidence.json", out_txt="research_evidence.txt"):
-    items = wiki_research(topic, k=k)
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-    with open(out_txt, "w", encoding="utf-8") as f:
-        for it in items:
-            f.write(f"{it['id']}|{it['title']}: {it['text']} (src: {it['source']})\n")
-    return items, out_json, out_txt
+def _search_all(topic):
+    pool = ThreadPoolExecutor(max_workers=len(QUERIES))
+    # one context copy per task: each carries the caller's deadline (and profiling trace)
+    futures = [pool.submit(contextvars.copy_context().run, _wiki_search, q.format(topic=topic), 3)
+               for q in QUERIES]
+    wait(futures, timeout=deadline.cap(None))
+    pool.shutdown(wait=False, cancel_futures=True)
+    results = []
+    for f in futures:
+        if not f.done() or f.cancelled() or deadline.cut_off(f.exception()):
+            deadline.note("wikipedia search cut short")
+            continue
+        results.append(f.result())
+    return results
+
+@stage("research.wiki")
+def wiki_research(topic: str, k: int = 6):
+    titles = _dedupe_titles(_search_all(topic))
+    out, pos = [], 0
+    want = k * OVERSAMPLE   # still a single extracts batch; ranking keeps the best k
+    while len(out) < want and pos < len(titles):
+        batch = _next_batch(titles, pos, len(out), want)
+        pos += len(batch)
+        try:
+            out += _items_from(batch, _wiki_extracts(batch))
+        except Exception as e:
+            if not deadline.cut_off(e):
+                raise
+            deadline.note("wikipedia extracts cut short")
+            break
+    return _assign_ids(topic, out, k)
+
+# ── Async variant ────────────────────────────────────────────────────────────
+async def _wiki_search_async(query: str, k: int):
+    r = await http_client.get_async(SEARCH_API.format(q=quote(query), k=k), headers=HEADERS)
+    r.raise_for_status()
+    hits = r.json().get("query", {}).get("search", [])
+    return [h["title"] for h in hits if h.get("title")]
+
+async def _wiki_extracts_async(titles):
+    r = await http_client.get_async(EXTRACTS_API, params=_extracts_params(titles), headers=HEADERS)
+    r.raise_for_status()
+    return _map_extracts(titles, r.json())
+
+async def wiki_research_async(topic: str, k: int = 6):
+    """Async wiki_research: same queries and batching over the shared pooled httpx client."""
+    results = await asyncio.gather(*(_wiki_search_async(q.format(topic=topic), 3) for q in QUERIES),
+                                   return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException) and not deadline.cut_off(r):
+            raise r
+    if any(isinstance(r, BaseException) for r in results):
+        deadline.note("wikipedia search cut short")
+    titles = _dedupe_titles(r for r in results if not isinstance(r, BaseException))
+    out, pos = [], 0
+    want = k * OVERSAMPLE
+    while len(out) < want and pos < len(titles):
+        batch = _next_batch(titles, pos, len(out), want)
+        pos += len(batch)
+        try:
+            out += _items_from(batch, await _wiki_extracts_async(batch))
+        except Exception as e:
+            if not deadline.cut_off(e):
+                raise
+            deadline.note("wikipedia extracts cut short")
+            break
+    return _assign_ids(topic, out, k)
+
+def format_evidence(items):
+    """Evidence as "ID|title: text (src: url)" lines, the form the agents quote from."""
+    return "\n".join(f"{it['id']}|{it['title']}: {it['text']} (src: {it['source']})" for it in items)
+
+def build_evidence(topic: str, k: int = 6):
+    return wiki_research(topic, k=k)
+
+async def build_evidence_async(topic: str, k: int = 6):
+    return await wiki_research_async(topic, k=k)
 
 if __name__ == "__main__":
     import sys
     topic = sys.argv[1] if len(sys.argv) > 1 else "Example headline"
-    items, j, t = build_evidence(topic)
-    print(f"Wrote {len(items)} items -> {j} and {t}")
+    print(format_evidence(build_evidence(topic)))
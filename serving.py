@@ -0,0 +1,166 @@
+# serving.py - admission control for request handlers: bounded workers, bounded queue, fast "busy"
+import asyncio, collections, functools, inspect, os, threading, time
+from contextlib import asynccontextmanager, contextmanager
+
+from profiling import percentile
+
+WORKERS = int(os.getenv("SERVE_WORKERS", 8))          # analyses running at once
+MAX_QUEUE = int(os.getenv("SERVE_QUEUE", 16))         # analyses allowed to wait for a worker
+MAX_WAIT = float(os.getenv("SERVE_MAX_WAIT", 120))    # refuse up front if the expected wait is longer (0 = off)
+SERVICE_ESTIMATE = 30.0   # seconds per job assumed until real ones have been timed
+
+class Busy(RuntimeError):
+    """Raised instead of queueing when the gate is full; retry_after is a wait estimate in seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class _Ticket:
+    __slots__ = ("queued_at", "granted", "_event", "_loop")
+
+    def __init__(self, loop=None):
+        self.queued_at = time.monotonic()
+        self.granted = False
+        self._loop = loop
+        self._event = asyncio.Event() if loop else threading.Event()
+
+    def wake(self):
+        if self._loop is None:
+            self._event.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event.set)
+
+class AdmissionGate:
+    """At most `workers` jobs run; up to `max_queue` more wait in FIFO order; the rest get Busy at once.
+
+    A job is also refused when the queue ahead of it would take longer than
+    max_wait to drain (from the running mean service time), so callers hear
+    "busy" immediately rather than after a long wait. Usable from threads
+    (admit) and event loops (admit_async) at the same time.
+    """
+
+    def __init__(self, name, workers=WORKERS, max_queue=MAX_QUEUE, max_wait=MAX_WAIT):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queue = collections.deque()
+        self._waits = collections.deque(maxlen=200)       # recent queue waits (s)
+        self._service = collections.deque(maxlen=50)      # recent run times (s)
+        self._counters = {"admitted": 0, "rejected": 0, "completed": 0}
+
+    def _service_time(self):
+        return sum(self._service) / len(self._service) if self._service else SERVICE_ESTIMATE
+
+    def _expected_wait(self, ahead):
+        # caller holds the lock; jobs ahead of us drain `workers` at a time
+        if self._running < self.workers and not ahead:
+            return 0.0
+        return (ahead // self.workers + 1) * self._service_time()
+
+    def _enter(self, ticket):
+        """Queue the ticket (or run it now); raises Busy if it may not wait."""
+        with self._lock:
+            if self._running < self.workers and not self._queue:
+                self._grant(ticket)
+                return
+            expected = self._expected_wait(len(self._queue))
+            if len(self._queue) >= self.max_queue or (self.max_wait and expected > self.max_wait):
+                self._counters["rejected"] += 1
+                raise Busy(f"{self.name}: {self._running} running, {len(self._queue)} waiting",
+                           round(expected, 1))
+            self._queue.append(ticket)
+
+    def _grant(self, ticket):
+        self._running += 1
+        self._counters["admitted"] += 1
+        self._waits.append(time.monotonic() - ticket.queued_at)
+        ticket.granted = True
+        ticket.wake()
+
+    def _leave(self, ticket, started):
+        with self._lock:
+            if ticket.granted:
+                self._running -= 1
+                if started is not None:
+                    self._service.append(time.monotonic() - started)
+                    self._counters["completed"] += 1
+            else:   # gave up while queued (client went away)
+                self._queue.remove(ticket)
+            while self._queue and self._running < self.workers:
+                self._grant(self._queue.popleft())
+
+    @contextmanager
+    def admit(self):
+        ticket = _Ticket()
+        self._enter(ticket)
+        started = None
+        try:
+            ticket._event.wait()
+            started = time.monotonic()
+            yield
+        finally:
+            self._leave(ticket, started)
+
+    @asynccontextmanager
+    async def admit_async(self):
+        ticket = _Ticket(asyncio.get_running_loop())
+        self._enter(ticket)
+        started = None
+        try:
+            await ticket._event.wait()
+            started = time.monotonic()
+            yield
+        finally:
+            self._leave(ticket, started)
+
+    def gated(self, on_busy):
+        """Decorator: run the handler inside admit(); on Busy return (or yield) on_busy(exc) instead."""
+        def wrap(fn):
+            if inspect.isasyncgenfunction(fn):
+                @functools.wraps(fn)
+                async def agen(*args, **kwargs):
+                    try:
+                        async with self.admit_async():
+                            async for item in fn(*args, **kwargs):
+                                yield item
+                    except Busy as e:
+                        yield on_busy(e)
+                return agen
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def coro(*args, **kwargs):
+                    try:
+                        async with self.admit_async():
+                            return await fn(*args, **kwargs)
+                    except Busy as e:
+                        return on_busy(e)
+                return coro
+
+            @functools.wraps(fn)
+            def plain(*args, **kwargs):
+                try:
+                    with self.admit():
+                        return fn(*args, **kwargs)
+                except Busy as e:
+                    return on_busy(e)
+            return plain
+        return wrap
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            oldest = time.monotonic() - self._queue[0].queued_at if self._queue else 0.0
+            return {
+                "name": self.name, "workers": self.workers, "max_queue": self.max_queue,
+                "running": self._running, "queued": len(self._queue),
+                "oldest_wait_s": round(oldest, 1),
+                "expected_wait_s": round(self._expected_wait(len(self._queue)), 1),
+                "wait_p50_s": round(percentile(waits, 50), 2),
+                "wait_p95_s": round(percentile(waits, 95), 2),
+                "service_mean_s": round(self._service_time(), 1),
+                **self._counters,
+            }
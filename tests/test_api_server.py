@@ -0,0 +1,88 @@
+import http.client, json, os, sys, threading, unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents2, api_server
+from fakes import FakeGeminiClient
+from llm_scheduler import CallScheduler
+
+class ApiServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._scheduler, cls._cache = agents2.CALL_SCHEDULER, agents2.RESPONSE_CACHE
+        agents2.set_call_scheduler(CallScheduler(rpm=0, tpm=0, max_concurrent=0))
+        agents2.set_response_cache(None)
+        cls.httpd = api_server.serve(FakeGeminiClient(), port=0)
+        threading.Thread(target=cls.httpd.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        agents2.set_call_scheduler(cls._scheduler)
+        agents2.set_response_cache(cls._cache)
+
+    def _conn(self):
+        return http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1], timeout=10)
+
+    def _post(self, body, conn=None):
+        conn = conn or self._conn()
+        conn.request("POST", "/v1/check", json.dumps(body), {"Content-Type": "application/json"})
+        r = conn.getresponse()
+        return r.status, json.loads(r.read())
+
+    def test_malformed_evidence_items_are_rejected(self):
+        for evidence in ([{"id": "E1"}], [{"id": 1, "text": "x"}], [["E1", "x"]], [None]):
+            with self.subTest(evidence=evidence):
+                status, body = self._post({"headline": "Sky is green", "mode": "quick", "evidence": evidence})
+                self.assertEqual(status, 400, body)
+
+    def test_non_bool_flags_and_fractional_ints_are_rejected(self):
+        for extra in ({"reuse": "no"}, {"reuse": "false"}, {"auto_research": 0}, {"rounds": 1.5}, {"k": 3.9}):
+            with self.subTest(extra=extra):
+                status, body = self._post({"headline": "Sky is green", **extra})
+                self.assertEqual(status, 400, body)
+
+    def test_malformed_requests_are_rejected_before_admission(self):
+        with mock.patch.object(api_server.CHECK_GATE, "admit", side_effect=AssertionError("admitted")):
+            status, body = self._post({"headline": "Sky is green", "rounds": 0})
+        self.assertEqual(status, 400, body)
+
+    def test_string_evidence_items_are_parsed(self):
+        status, body = self._post({"headline": "Sky is green", "mode": "quick",
+                                   "evidence": ["E1|The sky is blue.", {"id": "E2", "text": "Grass is green."}]})
+        self.assertEqual(status, 200, body)
+        self.assertEqual([it["id"] for it in body["evidence"]], ["E1", "E2"])
+
+    def test_early_replies_leave_keep_alive_in_sync(self):
+        token, api_server.API_TOKEN = api_server.API_TOKEN, "secret"
+        try:
+            conn = self._conn()
+            for path in ("/v1/check", "/v1/nowhere"):
+                with self.subTest(path=path):
+                    conn.request("POST", path, json.dumps({"headline": "x"}), {"Content-Type": "application/json"})
+                    r = conn.getresponse()
+                    r.read()
+                    self.assertIn(r.status, (401, 404))
+                    conn.request("GET", "/healthz")
+                    r = conn.getresponse()
+                    r.read()
+                    self.assertEqual(r.status, 200)
+        finally:
+            api_server.API_TOKEN = token
+
+    def test_oversized_body_closes_the_connection(self):
+        limit, api_server.MAX_BODY = api_server.MAX_BODY, 1024
+        try:
+            conn = self._conn()
+            conn.request("POST", "/v1/check", b"x" * 2048)   # small enough to sit in socket buffers
+            r = conn.getresponse()
+        finally:
+            api_server.MAX_BODY = limit
+        r.read()
+        self.assertEqual(r.status, 400)
+        self.assertEqual(r.getheader("Connection"), "close")
+
+if __name__ == "__main__":
+    unittest.main()
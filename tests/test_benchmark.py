@@ -0,0 +1,49 @@
+import json, os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents2, benchmark
+from fakes import FakeGeminiClient
+from jobs import ResultLog, load_records
+from llm_scheduler import CallScheduler
+
+CASES = [{"id": "a", "headline": "Sky is green", "expected": "FALSE"},
+         {"id": "b", "headline": "Water is wet", "expected": "TRUE"}]
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self._scheduler, self._cache = agents2.CALL_SCHEDULER, agents2.RESPONSE_CACHE
+        agents2.set_call_scheduler(CallScheduler(rpm=0, tpm=0, max_concurrent=0))
+        agents2.set_response_cache(None)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.tmp.name, "results.jsonl")
+
+    def tearDown(self):
+        agents2.set_call_scheduler(self._scheduler)
+        agents2.set_response_cache(self._cache)
+        self.tmp.cleanup()
+
+    def test_errored_cases_are_retried_and_counted_once(self):
+        failed = {"id": "a", "headline": "Sky is green", "expected": "FALSE", "debate_result": "ERROR",
+                  "control_result": "ERROR", "error": "429 RESOURCE_EXHAUSTED", "debate_correct": False,
+                  "control_correct": False, "wall_s": 0.1}
+        with open(self.out, "w", encoding="utf-8") as f:
+            f.write(json.dumps(failed) + "\n")
+        results = benchmark.run_benchmark(FakeGeminiClient(), CASES, self.out, rounds=1)
+        self.assertEqual(sorted(r["id"] for r in results), ["a", "b"])
+        self.assertFalse(any(r.get("error") for r in results))
+        summary = benchmark.summarize(benchmark.latest(ResultLog(self.out).read()))
+        self.assertEqual((summary["cases"], summary["errors"]), (2, 0))
+
+    def test_csv_evidence_is_parsed(self):
+        path = os.path.join(self.tmp.name, "cases.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("id,headline,expected,evidence\nm,The moon is made of cheese,FALSE,R1|The moon is rock\n")
+        case = load_records(path)[0]
+        self.assertEqual(case["evidence"], "R1|The moon is rock")
+        rec = benchmark.run_case(FakeGeminiClient(), case, rounds=1)
+        self.assertNotIn("error", rec)
+        self.assertNotEqual(rec["debate_result"], "ERROR")
+
+if __name__ == "__main__":
+    unittest.main()
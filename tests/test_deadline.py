@@ -0,0 +1,33 @@
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents2, deadline
+from fakes import FakeGeminiClient
+from llm_scheduler import CallScheduler
+from pipeline import analyze
+
+EVIDENCE = "E1|The company confirmed the change in a press release."
+
+class ShortDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self._scheduler, self._cache = agents2.CALL_SCHEDULER, agents2.RESPONSE_CACHE
+        agents2.set_call_scheduler(CallScheduler(rpm=0, tpm=0, max_concurrent=0))
+        agents2.set_response_cache(None)
+
+    def tearDown(self):
+        agents2.set_call_scheduler(self._scheduler)
+        agents2.set_response_cache(self._cache)
+
+    def test_reserve_scales_with_the_deadline(self):
+        self.assertEqual(deadline.Deadline(90).judge_reserve(), deadline.JUDGE_RESERVE)
+        self.assertAlmostEqual(deadline.Deadline(2).judge_reserve(), 0.5)
+
+    def test_short_deadline_still_debates(self):
+        result = analyze(FakeGeminiClient(latency=0.05), "Company renames its flagship product", EVIDENCE,
+                         rounds=1, auto_research=False, reuse=False, deadline_s=1.5)
+        self.assertGreaterEqual(result["verdict"].get("rounds_run", 0), 1)
+        self.assertTrue(result["transcript"].strip())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os, sys, threading, time, unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deadline, http_client
+
+class _RateLimited(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(429)
+        self.send_header("Retry-After", "120")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class RetryAfterTest(unittest.TestCase):
+    def setUp(self):
+        _RateLimited.hits = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimited)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_sync_get_does_not_sleep_past_the_deadline(self):
+        t0 = time.monotonic()
+        with deadline.use(deadline.start(1.0)):
+            r = http_client.get(self.url)
+        self.assertEqual(r.status_code, 429)
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual(_RateLimited.hits, 1)
+
+    def test_retry_after_is_capped(self):
+        retry = http_client._retry()
+        response = type("R", (), {"headers": {"Retry-After": "3600"}})()
+        self.assertEqual(retry.get_retry_after(response), http_client.RETRY_AFTER_MAX)
+
+if __name__ == "__main__":
+    unittest.main()
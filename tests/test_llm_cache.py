@@ -0,0 +1,40 @@
+import asyncio, os, sys, unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents2
+from fakes import FakeGeminiClient
+from llm_cache import ResponseCache
+from llm_scheduler import CallScheduler
+
+class MalformedResponseTest(unittest.TestCase):
+    """Only verdict JSON is cached; a malformed judge/control answer is asked for again."""
+
+    def setUp(self):
+        self._scheduler, self._cache = agents2.CALL_SCHEDULER, agents2.RESPONSE_CACHE
+        agents2.set_call_scheduler(CallScheduler(rpm=0, tpm=0, max_concurrent=0))
+        self.cache = ResponseCache(disk_path=None)
+        agents2.set_response_cache(self.cache)
+
+    def tearDown(self):
+        agents2.set_call_scheduler(self._scheduler)
+        agents2.set_response_cache(self._cache)
+
+    def test_malformed_control_is_not_cached(self):
+        client = FakeGeminiClient()
+        with mock.patch.object(client, "_answer", return_value="I think it's probably false."):
+            self.assertTrue(agents2.control_verdict(client, "Sky is green").get("parse_error"))
+        self.assertEqual(self.cache.stats["stores"], 0)
+        verdict = agents2.control_verdict(client, "Sky is green")
+        self.assertNotIn("parse_error", verdict)
+        self.assertEqual(self.cache.stats["stores"], 1)
+
+    def test_malformed_judge_is_not_cached_async(self):
+        client = FakeGeminiClient()
+        with mock.patch.object(client, "_answer", return_value='{"label": "maybe"}'):
+            asyncio.run(agents2.judge_verdict_async(client, "Sky is green", "PRO: R1 says so."))
+        self.assertEqual(self.cache.stats["stores"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio, os, sys, threading, time, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadline import Deadline, DeadlineExceeded
+from llm_scheduler import CallScheduler
+
+def _drain(bucket):
+    bucket.level = 0.0
+    bucket._stamp = time.monotonic()
+
+class ReleaseIntoEmptyBucketTest(unittest.TestCase):
+    """A call parked on the concurrency cap must still go once the rate bucket refills."""
+
+    def setUp(self):
+        # 60 rpm refills one request per second
+        self.sched = CallScheduler(rpm=60, tpm=0, max_concurrent=1)
+
+    def test_sync_waiter_wakes_after_refill(self):
+        self.sched.acquire(1)
+        _drain(self.sched.requests)
+        admitted = threading.Event()
+        threading.Thread(target=lambda: (self.sched.acquire(1), admitted.set()), daemon=True).start()
+        time.sleep(0.1)                  # the second call is queued behind the cap
+        self.sched.release(1)            # slot free, bucket still empty
+        self.assertTrue(admitted.wait(5), "queued call never admitted after the bucket refilled")
+        self.sched.release(1)
+
+    def test_async_waiter_wakes_after_refill(self):
+        async def run():
+            await self.sched.acquire_async(1)
+            _drain(self.sched.requests)
+            waiter = asyncio.ensure_future(self.sched.acquire_async(1))
+            await asyncio.sleep(0.1)
+            self.sched.release(1)
+            await asyncio.wait_for(waiter, 5)
+            self.sched.release(1)
+        asyncio.run(run())
+
+class AbandonedCallTest(unittest.TestCase):
+    """A call the deadline stopped waiting for keeps its slot until it really returns."""
+
+    def test_slot_held_until_worker_finishes(self):
+        sched = CallScheduler(rpm=0, tpm=0, max_concurrent=1)
+        finished = threading.Event()
+        def slow():
+            time.sleep(0.3)
+            finished.set()
+        with self.assertRaises(DeadlineExceeded):
+            sched.call(slow, 1, deadline=Deadline(0.05))
+        self.assertEqual(sched.stats()["active"], 1)
+        self.assertTrue(finished.wait(5))
+        time.sleep(0.05)
+        self.assertEqual(sched.stats()["active"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structured
+
+try:
+    from google.genai import _api_client, models
+except ImportError:
+    models = None
+
+@unittest.skipIf(models is None, "google-genai not installed")
+class VerdictConfigTest(unittest.TestCase):
+    """The fakes never reach the SDK's request converter, so run the verdict config through it here."""
+
+    def test_config_converts_for_the_gemini_api(self):
+        client = _api_client.ApiClient(api_key="test-key")
+        out = models._GenerateContentConfig_to_mldev(client, structured.json_config(0.1, structured.VERDICT_SCHEMA))
+        self.assertEqual(out["responseMimeType"], "application/json")
+        self.assertEqual(out["responseSchema"]["required"], ["label", "confidence", "rationale"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+from verdict_store import VerdictStore
+
+RESULT = {"headline": "", "label": "true", "confidence": 80}
+
+# (stored claim, counter-claim that must not reuse its verdict)
+COUNTER_CLAIMS = [
+    ("Meta discontinues the Quest 3 headset", "Meta continues the Quest 3 headset"),
+    ("Apple confirms the iPhone 16 launch date", "Apple denies the iPhone 16 launch date"),
+    ("Senate passes the climate bill", "Senate rejects the climate bill"),
+    ("Vaccine is safe for children", "Vaccine is unsafe for children"),
+    ("Company reports profit in 2023", "Company reports profit in 2024"),
+    ("Study finds coffee raises cancer risk", "Study finds coffee lowers cancer risk"),
+    ("Mayor was arrested on Monday", "Mayor was not arrested on Monday"),
+    # same words, roles reversed
+    ("Apple buys Intel", "Intel buys Apple"),
+    ("Israel attacks Iran", "Iran attacks Israel"),
+    ("Biden beats Trump", "Trump beats Biden"),
+]
+
+# (stored headline, rewording that should reuse it)
+REWORDINGS = [
+    ("Meta discontinues the Quest 3 headset", "Meta has discontinued the Quest 3 headset!"),
+    ("Apple releases iPhone 15.0", "apple released the iphone 15"),
+]
+
+class VerdictReuseTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = VerdictStore(path=os.path.join(self.tmp.name, "verdicts.sqlite"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_counter_claims_do_not_share_a_verdict(self):
+        for claim, counter in COUNTER_CLAIMS:
+            self.store.remember(claim, dict(RESULT, headline=claim))
+        for claim, counter in COUNTER_CLAIMS:
+            with self.subTest(counter=counter):
+                hit = self.store.lookup(counter)
+                self.assertIsNone(hit, f"{counter!r} reused {hit and hit['cached']['matched_headline']!r}")
+
+    def test_rewordings_reuse_the_verdict(self):
+        for stored, reworded in REWORDINGS:
+            self.store.remember(stored, dict(RESULT, headline=stored))
+            with self.subTest(reworded=reworded):
+                hit = self.store.lookup(reworded)
+                self.assertIsNotNone(hit)
+                self.assertEqual(hit["cached"]["matched_headline"], stored)
+
+class ReuseScopeTest(unittest.TestCase):
+    def test_debate_settings_are_part_of_the_scope(self):
+        base = pipeline._reuse_scope(None, True, "news", rounds=1, k=5, adaptive=True)
+        self.assertNotEqual(base, pipeline._reuse_scope(None, True, "news", rounds=5, k=5, adaptive=True))
+        self.assertNotEqual(base, pipeline._reuse_scope(None, True, "news", rounds=1, k=8, adaptive=True))
+        self.assertNotEqual(base, pipeline._reuse_scope(None, True, "news", rounds=1, k=5, adaptive=False))
+
+    def test_manual_evidence_never_reuses(self):
+        self.assertIsNone(pipeline._reuse_scope("E1|text", True, "news"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+# verdict_store.py - reuse recent verdicts for the same headline, reworded
+import json, os, re, sqlite3, threading, time
+from contextlib import contextmanager
+
+STORE_PATH = os.getenv("VERDICT_STORE_PATH", os.path.join(".cache", "verdicts.sqlite"))
+MAX_AGE = int(os.getenv("VERDICT_MAX_AGE", 6 * 3600))          # seconds a verdict stays reusable
+MAX_ENTRIES = int(os.getenv("VERDICT_STORE_MAX_ENTRIES", 20000))
+ENABLED = os.getenv("VERDICT_REUSE", "1") != "0"
+
+_FILLER = frozenset("a an the has have had is are was were been be just officially reportedly".split())
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+def normalize_headline(headline: str) -> str:
+    """Canonical form: lowercase, no punctuation/filler words, crude suffix stemming, '2.0' -> '2'."""
+    h = (headline or "").lower()
+    h = re.sub(r"(\d+)\.0\b", r"\1", h)
+    words = []
+    for w in re.findall(r"[a-z0-9]+", h):
+        if w in _FILLER:
+            continue
+        for suf in _SUFFIXES:
+            if len(w) > len(suf) + 3 and w.endswith(suf):
+                w = w[:-len(suf)]
+                break
+        words.append(w)
+    return " ".join(words)
+
+def match_key(norm: str) -> str:
+    """Key two headlines must share to reuse a verdict: their normalized words, in order.
+
+    Matching is exact on purpose. One changed word ("continues"/"discontinues", a
+    number, "not") can flip a claim, and so can swapped roles ("Apple buys Intel" /
+    "Intel buys Apple"), so only filler words, word endings, punctuation and case
+    may differ.
+    """
+    return " ".join(norm.split())
+
+class VerdictStore:
+    """Lookup of stored analysis results by normalized headline (see match_key).
+
+    An in-memory index (scope, key) -> freshest entry answers lookups. Entries
+    persist in SQLite and are reloaded (minus stale ones) on first use.
+    """
+
+    def __init__(self, path=STORE_PATH, max_age=MAX_AGE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries = {}      # id -> ((scope, key), created)
+        self._index = {}        # (scope, key) -> id of the freshest entry
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    @contextmanager
+    def _connect(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS verdicts (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "headline TEXT, norm TEXT, scope TEXT, result TEXT, created REAL)")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _add(self, eid, norm, scope, created):
+        ref = (scope, match_key(norm))
+        self._entries[eid] = (ref, created)
+        self._index[ref] = eid   # ids are insertion-ordered, so the newest wins
+
+    def _drop(self, eid):
+        ref = self._entries.pop(eid)[0]
+        if self._index.get(ref) == eid:
+            del self._index[ref]
+
+    def _load(self):
+        if self._loaded:
+            return
+        cutoff = time.time() - self.max_age
+        with self._connect() as conn:
+            conn.execute("DELETE FROM verdicts WHERE created < ?", (cutoff,))
+            for eid, norm, scope, created in conn.execute(
+                    "SELECT id, norm, scope, created FROM verdicts ORDER BY id"):
+                self._add(eid, norm, scope, created)
+        self._loaded = True
+
+    def _match(self, norm, scope, now):
+        eid = self._index.get((scope, match_key(norm)))
+        if eid is None or now - self._entries[eid][1] > self.max_age:
+            return None
+        return eid
+
+    def lookup(self, headline, scope="news"):
+        """Freshest verdict for a headline with the same normalized words in this scope, or None.
+
+        Returns the stored result with a 'cached' block: matched headline,
+        age in seconds and the store id.
+        """
+        now = time.time()
+        norm = normalize_headline(headline)
+        with self._lock:
+            self._load()
+            eid = self._match(norm, scope, now)
+            if eid is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+        with self._connect() as conn:
+            row = conn.execute("SELECT headline, result, created FROM verdicts WHERE id = ?", (eid,)).fetchone()
+        if not row:
+            return None
+        result = json.loads(row[1])
+        result["cached"] = {"matched_headline": row[0], "age_s": round(now - row[2], 1), "store_id": eid}
+        return result
+
+    def remember(self, headline, result, scope="news"):
+        norm, now = normalize_headline(headline), time.time()
+        payload = json.dumps({k: v for k, v in result.items() if k != "cached"}, ensure_ascii=False)
+        with self._lock:
+            self._load()
+            with self._connect() as conn:
+                eid = conn.execute(
+                    "INSERT INTO verdicts (headline, norm, scope, result, created) VALUES (?, ?, ?, ?, ?)",
+                    (headline, norm, scope, payload, now)).lastrowid
+                self._add(eid, norm, scope, now)
+                self.stats["stores"] += 1
+                if len(self._entries) > self.max_entries:
+                    # oldest first; ids are insertion-ordered
+                    stale = sorted(self._entries)[:len(self._entries) - self.max_entries]
+                    conn.executemany("DELETE FROM verdicts WHERE id = ?", [(i,) for i in stale])
+                    for i in stale:
+                        self._drop(i)
+        return eid
+
+_default = None
+
+def get_store() -> VerdictStore:
+    global _default
+    if _default is None:
+        _default = VerdictStore()
+    return _default